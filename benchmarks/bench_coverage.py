@@ -0,0 +1,103 @@
+"""
+Benchmark for coverage analysis with the ZIP interval index.
+
+Generates synthetic hourly ZIP time ranges and events for one server, checks
+the indexed lookup against the original linear scan on a sample, then times
+check_coverage_for_server at full scale.
+
+Usage:
+    python benchmarks/bench_coverage.py [--events 100000] [--zips 5000]
+"""
+import argparse
+import contextlib
+import io
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src import coverage_analyzer
+from src.event_model import Event
+
+
+def generate_zip_files(count, start=datetime(2025, 1, 1)):
+    """Generate hourly ZIP ranges with occasional overlaps and gaps."""
+    zip_files = []
+    current = start
+    
+    for i in range(count):
+        duration = timedelta(hours=1) + timedelta(minutes=random.choice([-5, 0, 0, 0, 10]))
+        zip_files.append({
+            'filename': f"Event_Report_bench_{i}.zip",
+            'start_datetime': current,
+            'end_datetime': current + duration,
+        })
+        current += timedelta(hours=1)
+        if random.random() < 0.01:
+            current += timedelta(hours=random.randint(1, 6))
+    
+    return zip_files
+
+
+def generate_events(count, zip_files):
+    """Generate events spread over (and slightly beyond) the ZIP time ranges."""
+    first = zip_files[0]['start_datetime'] - timedelta(hours=2)
+    span = (zip_files[-1]['end_datetime'] - first).total_seconds() + 7200
+    events = []
+    
+    for i in range(count):
+        event_time = first + timedelta(seconds=random.uniform(0, span))
+        events.append(Event('bench', f"bench-{i % 50}", '', event_time.strftime("%Y-%m-%d %H:%M:%S"), event_time))
+    
+    events.sort(key=lambda e: e.datetime_obj)
+    return events
+
+
+def linear_scan_first_match(event_time, zip_files):
+    """Reference lookup: the original nested-loop first-match scan."""
+    for zip_info in zip_files:
+        if zip_info['start_datetime'] <= event_time <= zip_info['end_datetime']:
+            return zip_info['filename']
+    return None
+
+
+def run(events_count, zips_count, sample_size, seed):
+    random.seed(seed)
+    zip_files = generate_zip_files(zips_count)
+    events = generate_events(events_count, zip_files)
+    print(f"Generated {len(events)} events and {len(zip_files)} ZIP files")
+    
+    # Check first-match semantics against the linear scan on a sample
+    index = coverage_analyzer.ZipIntervalIndex(zip_files)
+    for event in random.sample(events, min(sample_size, len(events))):
+        expected = linear_scan_first_match(event.datetime_obj, zip_files)
+        found = index.find(event.datetime_obj)
+        assert (found['filename'] if found else None) == expected, event
+    print(f"Verified {min(sample_size, len(events))} sampled lookups against the linear scan")
+    
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        report = coverage_analyzer.check_coverage_for_server("bench", events, zip_files)
+    elapsed = time.perf_counter() - start
+    
+    print(f"check_coverage_for_server: {elapsed:.3f}s")
+    print(f"  Covered: {len(report['covered_events'])}, uncovered: {len(report['uncovered_events'])}, gaps: {len(report['gaps'])}")
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--events', type=int, default=100000)
+    parser.add_argument('--zips', type=int, default=5000)
+    parser.add_argument('--sample', type=int, default=2000, help="Lookups verified against the linear scan")
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+    
+    run(args.events, args.zips, args.sample, args.seed)
+
+
+if __name__ == "__main__":
+    main()
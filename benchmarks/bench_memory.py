@@ -0,0 +1,150 @@
+"""
+Memory benchmark for the in-memory event and report row representation.
+
+Writes a synthetic CSV with many events, then measures with tracemalloc the
+memory held by the parsed events plus their per-server and merged report
+rows, once with the compact Event/ReportRow records and once with the
+previous layout (a full CSV row dict per event, an excel_row dict and a
+merged copy of it).
+
+Usage:
+    python benchmarks/bench_memory.py [--events 1000000] [--servers 20]
+"""
+import argparse
+import contextlib
+import gc
+import io
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.event_model import ReportRow
+from src.event_processor import MultiServerEventProcessor
+
+DESCRIPTIONS = ['WRONGWAY', 'CONGESTED', 'STOPPED', 'PEDESTRIAN']
+
+
+def write_csv(path, events, servers, seed=1):
+    """Write a CSV of events spread over one day and several servers."""
+    rng = random.Random(seed)
+    start = datetime(2025, 7, 16)
+
+    with open(path, 'w', encoding='utf-8-sig', newline='') as f:
+        f.write("Name;Description;Date/Time;End Date/Time;True Event;Notes\n")
+        for i in range(events):
+            event_time = start + timedelta(seconds=rng.randrange(86400))
+            f.write(
+                f"server{i % servers:02d}-{rng.randrange(8)};{rng.choice(DESCRIPTIONS)};"
+                f"{event_time:%Y-%m-%d %H:%M:%S};{event_time + timedelta(minutes=3):%Y-%m-%d %H:%M:%S};"
+                f"UNMARKED_EVT;\n"
+            )
+
+
+def legacy_events(csv_path):
+    """Parse the CSV into the previous layout: full CSV row dicts with the added keys."""
+    df = pd.read_csv(csv_path, sep=';', dtype=str, keep_default_na=False, index_col=False, encoding='utf-8-sig')
+    datetimes = pd.to_datetime(df['Date/Time'], format="%Y-%m-%d %H:%M:%S")
+    server_ids = df['Name'].str[:8]
+    legacy = {}
+    for server_id, group_index in server_ids.groupby(server_ids, sort=False).groups.items():
+        rows = df.loc[group_index].to_dict('records')
+        for global_index, (row, event_datetime) in enumerate(zip(rows, datetimes.loc[group_index].dt.to_pydatetime())):
+            row['datetime_obj'] = event_datetime
+            row['global_index'] = global_index
+            row['zip_media_index'] = global_index % 50
+        legacy[server_id] = rows
+    return legacy
+
+
+def legacy_rows(legacy_by_server):
+    """Rebuild the previous report rows: an excel_row dict per event and a merged copy."""
+    server_rows, merged_rows = [], []
+    for server_id, rows in legacy_by_server.items():
+        for row in rows:
+            formatted_datetime = row['datetime_obj'].strftime("%Y-%m-%d-%H-%M-%S")
+            excel_row = {
+                'Server': server_id,
+                'Name': row['Name'],
+                'Description': row['Description'],
+                'Date/Time': row['datetime_obj'].strftime("%d/%m/%Y %H:%M:%S"),
+                'End Date/Time': row['End Date/Time'],
+                'True Event': row['True Event'],
+                'Data Intervento': '',
+                'Attività svolta': '',
+                'Screenshot': f"{server_id}/screenshots/{row['Name']}_{row['Description']}_{formatted_datetime}.png"
+            }
+            server_rows.append(excel_row)
+            merged_rows.append(excel_row.copy())
+    return server_rows, merged_rows
+
+
+def compact_rows(processor, events_by_server):
+    """Build the report rows as the processor does: one shared row per event."""
+    server_rows, merged_rows = [], []
+    for server_id, events in events_by_server.items():
+        for event in events:
+            formatted_datetime = event.datetime_obj.strftime("%Y-%m-%d-%H-%M-%S")
+            screenshots = (f"{server_id}/screenshots/{event.name}_{event.description}_{formatted_datetime}.png",)
+            row = ReportRow(event, screenshots, processor.row_columns)
+            server_rows.append(row)
+            merged_rows.append(row)
+    return server_rows, merged_rows
+
+
+def measure(build):
+    """Return (result, MiB held, seconds) for a build function."""
+    gc.collect()
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = build()
+    elapsed = time.perf_counter() - start
+    gc.collect()
+    held = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return result, held / 2**20, elapsed
+
+
+def run(events_count, servers):
+    with tempfile.TemporaryDirectory() as scratch:
+        csv_path = os.path.join(scratch, "EventsReportFrom bench.csv")
+        write_csv(csv_path, events_count, servers)
+        print(f"Generated {events_count} events for {servers} servers")
+
+        processor = MultiServerEventProcessor(log_level='WARNING', metrics_dir=None)
+        with contextlib.redirect_stdout(io.StringIO()):
+            events_by_server, events_mib, parse_seconds = measure(lambda: processor.read_and_group_events_by_server(csv_path))
+        rows, rows_mib, _ = measure(lambda: compact_rows(processor, events_by_server))
+        compact_mib = events_mib + rows_mib
+        del rows
+
+        legacy_by_server, legacy_events_mib, _ = measure(lambda: legacy_events(csv_path))
+        legacy_rows_result, legacy_rows_mib, _ = measure(lambda: legacy_rows(legacy_by_server))
+        legacy_mib = legacy_events_mib + legacy_rows_mib
+        del legacy_rows_result, legacy_by_server
+
+    print(f"\nCSV parse: {parse_seconds:.2f}s")
+    print(f"{'':<22} {'events':>10} {'rows':>10} {'total':>10}")
+    print(f"{'Previous (dicts)':<22} {legacy_events_mib:>9.1f}M {legacy_rows_mib:>9.1f}M {legacy_mib:>9.1f}M")
+    print(f"{'Compact records':<22} {events_mib:>9.1f}M {rows_mib:>9.1f}M {compact_mib:>9.1f}M")
+    print(f"Reduction: {(1 - compact_mib / legacy_mib) * 100:.0f}% ({legacy_mib / compact_mib:.1f}x less memory)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark event and report row memory use")
+    parser.add_argument('--events', type=int, default=1000000)
+    parser.add_argument('--servers', type=int, default=20)
+    args = parser.parse_args()
+
+    run(args.events, args.servers)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""
+Benchmark for the screenshot seek modes.
+
+Times extract_screenshots with each seek mode ('legacy', 'exact', 'fast')
+on the given videos, or on a generated one when none are given, and reports
+how far the decoded frames landed from the requested timestamps.
+
+Usage:
+    python benchmarks/bench_seek.py [video.mkv ...] [--timestamps 5 13 20] [--repeat 3]
+"""
+import argparse
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import time
+
+import cv2
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.video_processing import extract_screenshots
+
+SEEK_MODES = ['legacy', 'exact', 'fast']
+
+
+def generate_video(path, seconds=30, fps=25, size=(320, 240)):
+    """Write a synthetic video whose frames all differ (a moving bar and a frame counter)."""
+    writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*'mp4v'), fps, size)
+    width, height = size
+
+    for index in range(seconds * fps):
+        frame = np.zeros((height, width, 3), dtype=np.uint8)
+        x = (index * 4) % width
+        frame[:, x:x + 8] = (0, 255, 255)
+        cv2.putText(frame, str(index), (10, height // 2), cv2.FONT_HERSHEY_SIMPLEX, 1.5, (255, 255, 255), 2)
+        writer.write(frame)
+
+    writer.release()
+
+
+def run_mode(video_path, timestamps, seek_mode, output_dir, repeat):
+    """Return (best wall time, landed timestamps) for one seek mode."""
+    captures = [(timestamp, os.path.join(output_dir, f"{seek_mode}_{i}.png")) for i, timestamp in enumerate(timestamps)]
+    best = None
+    results = None
+
+    for _ in range(repeat):
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            results = extract_screenshots(video_path, captures, seek_mode=seek_mode)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+
+    return best, [result['actual_timestamp'] for result in results]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('videos', nargs='*', help="Videos to benchmark (default: a generated 30s video)")
+    parser.add_argument('--timestamps', type=float, nargs='+', default=[13.0])
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as output_dir:
+        videos = args.videos
+        if not videos:
+            generated = os.path.join(output_dir, "generated.mkv")
+            generate_video(generated)
+            videos = [generated]
+
+        print(f"{'video':<30} {'mode':<8} {'time':>10} {'mean err':>10} {'max err':>10}")
+        for video_path in videos:
+            for seek_mode in SEEK_MODES:
+                elapsed, landed = run_mode(video_path, args.timestamps, seek_mode, output_dir, args.repeat)
+                errors = [abs(actual - requested) for actual, requested in zip(landed, args.timestamps) if actual is not None]
+                if not errors:
+                    print(f"{os.path.basename(video_path):<30} {seek_mode:<8} {'failed':>10}")
+                    continue
+                print(f"{os.path.basename(video_path):<30} {seek_mode:<8} {elapsed * 1000:>8.1f}ms "
+                      f"{sum(errors) / len(errors) * 1000:>8.1f}ms {max(errors) * 1000:>8.1f}ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,158 @@
+"""
+Synthetic input data for benchmarks and manual testing.
+
+Writes an input directory the way the event export delivers it:
+EventsReportFrom*.csv files (cycling through the separator, datetime and
+row order dialects the parser accepts) and, per server, half-day
+Event_Report_<server>_from_..._to_....zip archives whose media/<n>/ folders
+hold a small generated .mkv video and an eventSnapshot.jpg. Media folders
+are numbered in the row order of the CSV file listing the server, so
+newest-first exports get newest-first folders. With --split-csv, every
+server is also listed in the next CSV file, overlapping by half its events,
+as repeated exports of the same period are.
+
+Usage:
+    python benchmarks/fixtures.py OUTPUT_DIR [--servers 2] [--zips-per-server 2] [--events-per-zip 3] [--split-csv]
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import zipfile
+from datetime import datetime, timedelta
+
+import cv2
+import numpy as np
+
+# (separator, Date/Time format, newest first) of each generated CSV file, used in turn
+CSV_DIALECTS = [
+    (';', "%Y-%m-%d %H:%M:%S", False),
+    (',', "%d/%m/%Y %H:%M", True),
+]
+
+DESCRIPTIONS = ['WRONGWAY', 'CONGESTED', 'STOPPED', 'PEDESTRIAN']
+ZIP_SPAN = timedelta(hours=12)
+
+
+def write_video(path, seed, seconds=20, fps=5, size=(160, 120)):
+    """Write a small video whose frames differ per seed and per frame."""
+    writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*'MJPG'), fps, size)
+    width, height = size
+
+    for index in range(seconds * fps):
+        frame = np.full((height, width, 3), (seed * 37 + index * 3) % 255, np.uint8)
+        cv2.putText(frame, f"{seed}:{index}", (5, height // 2), cv2.FONT_HERSHEY_SIMPLEX, 0.6, (255, 255, 255), 1)
+        writer.write(frame)
+
+    writer.release()
+
+
+def snapshot_bytes(seed, size=(160, 120)):
+    """Return a small JPEG standing in for the event snapshot."""
+    width, height = size
+    image = np.full((height, width, 3), (seed * 53) % 255, np.uint8)
+    return cv2.imencode('.jpg', image)[1].tobytes()
+
+
+def generate_fixture(output_dir, servers=2, zips_per_server=2, events_per_zip=3, csv_files=2,
+                     video_seconds=20, fps=5, size=(160, 120), start=datetime(2025, 7, 16), seed=1,
+                     split_csv=False):
+    """
+    Generate an input directory.
+
+    Returns:
+        dict: Counts of what was written ('events', 'zips', 'csv_files')
+    """
+    rng = random.Random(seed)
+    os.makedirs(output_dir, exist_ok=True)
+    events = []
+    video_seed = 0
+
+    with tempfile.TemporaryDirectory() as scratch:
+        video_path = os.path.join(scratch, "video.mkv")
+
+        for server_number in range(servers):
+            server_id = f"server{server_number:02d}"  # 8 characters, like real server IDs
+            newest_first = CSV_DIALECTS[(server_number % csv_files) % len(CSV_DIALECTS)][2]
+
+            for zip_number in range(zips_per_server):
+                zip_start = start + ZIP_SPAN * zip_number
+                zip_end = zip_start + ZIP_SPAN - timedelta(seconds=1)
+                name = f"Event_Report_{server_id}_from_{zip_start:%Y-%m-%d-%H-%M-%S}_to_{zip_end:%Y-%m-%d-%H-%M-%S}"
+
+                # Media folders are numbered in the CSV row order within the archive
+                offsets = sorted(
+                    (rng.randint(0, int(ZIP_SPAN.total_seconds()) // 60 - 1) for _ in range(events_per_zip)),
+                    reverse=newest_first
+                )
+
+                with zipfile.ZipFile(os.path.join(output_dir, f"{name}.zip"), 'w') as archive:
+                    for media_index, minutes in enumerate(offsets):
+                        write_video(video_path, video_seed, video_seconds, fps, size)
+                        archive.write(video_path, f"{name}/media/{media_index}/video_{media_index}.mkv")
+                        archive.writestr(f"{name}/media/{media_index}/eventSnapshot.jpg", snapshot_bytes(video_seed, size))
+                        video_seed += 1
+
+                        events.append((
+                            server_number,
+                            f"{server_id}-{media_index % 4}",
+                            rng.choice(DESCRIPTIONS),
+                            zip_start + timedelta(minutes=minutes)
+                        ))
+
+    events.sort(key=lambda event: event[3])
+
+    # Spread the servers over the CSV files, one dialect per file. Media folder
+    # numbers follow the row order within a ZIP, so a ZIP's events stay together
+    for file_number in range(csv_files):
+        separator, datetime_format, newest_first = CSV_DIALECTS[file_number % len(CSV_DIALECTS)]
+        csv_name = f"EventsReportFrom {start:%Y-%m-%d} 00_00_00 To {start:%Y-%m-%d} 23_59_00 ({file_number + 1}).csv"
+
+        rows = sorted((event for event in events if event[0] % csv_files == file_number),
+                      key=lambda event: event[3], reverse=newest_first)
+        if split_csv:
+            # The later half of each server listed in the previous file, again and in that file's order
+            for server_number in range(servers):
+                if (server_number + 1) % csv_files != file_number or server_number % csv_files == file_number:
+                    continue
+                server_events = [event for event in events if event[0] == server_number]
+                repeated = server_events[len(server_events) // 2:]
+                rows += sorted(repeated, key=lambda event: event[3],
+                               reverse=CSV_DIALECTS[(server_number % csv_files) % len(CSV_DIALECTS)][2])
+
+        with open(os.path.join(output_dir, csv_name), 'w', encoding='utf-8-sig', newline='') as f:
+            f.write(separator.join(['Name', 'Description', 'Date/Time', 'End Date/Time', 'True Event']) + '\n')
+            for server_number, name, description, event_datetime in rows:
+                end_datetime = event_datetime + timedelta(minutes=3)
+                f.write(separator.join([
+                    name, description,
+                    event_datetime.strftime(datetime_format), end_datetime.strftime(datetime_format),
+                    'UNMARKED_EVT'
+                ]) + '\n')
+
+    return {'events': len(events), 'zips': servers * zips_per_server, 'csv_files': csv_files}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('output_dir')
+    parser.add_argument('--servers', type=int, default=2)
+    parser.add_argument('--zips-per-server', type=int, default=2)
+    parser.add_argument('--events-per-zip', type=int, default=3)
+    parser.add_argument('--csv-files', type=int, default=2)
+    parser.add_argument('--video-seconds', type=int, default=20)
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--split-csv', action='store_true')
+    args = parser.parse_args()
+
+    counts = generate_fixture(
+        args.output_dir, servers=args.servers, zips_per_server=args.zips_per_server,
+        events_per_zip=args.events_per_zip, csv_files=args.csv_files,
+        video_seconds=args.video_seconds, seed=args.seed, split_csv=args.split_csv
+    )
+    print(f"Generated {counts['events']} events in {counts['zips']} ZIP files and {counts['csv_files']} CSV files under {args.output_dir}")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,214 @@
+"""
+Benchmark suite for the processing pipeline.
+
+Generates a synthetic input directory (see fixtures.py) at the chosen scale
+and times CSV parsing, coverage analysis, screenshot extraction, Excel
+writing and an end-to-end run. Results are saved as
+benchmarks/results/<commit>_<scale>.json so runs on different commits can be
+compared with --compare.
+
+Usage:
+    python benchmarks/run_benchmarks.py [--scale small|medium|large] [--repeat 3] [--compare COMMIT]
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import zipfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.fixtures import generate_fixture
+from src import coverage_analyzer, excel_report, file_utils
+from src.event_processor import MultiServerEventProcessor
+from src.video_processing import extract_screenshot
+
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "results")
+
+# servers, ZIP files per server, events per ZIP, Excel rows
+SCALES = {
+    'small': {'servers': 2, 'zips_per_server': 2, 'events_per_zip': 3, 'excel_rows': 10000},
+    'medium': {'servers': 4, 'zips_per_server': 4, 'events_per_zip': 10, 'excel_rows': 50000},
+    'large': {'servers': 8, 'zips_per_server': 8, 'events_per_zip': 25, 'excel_rows': 200000},
+}
+
+# Answers to the processing prompts for unattended runs
+POLICIES = {'csv_only': 'yes', 'coverage_issues': 'yes', 'merged_report': 'yes'}
+
+
+def current_commit():
+    """Return the short commit hash, with '-dirty' when the tree has changes or new files."""
+    root = os.path.dirname(RESULTS_DIR)
+    try:
+        commit = subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=root, capture_output=True, text=True, check=True
+        ).stdout.strip()
+        dirty = subprocess.run(
+            ['git', 'status', '--porcelain'], cwd=root, capture_output=True, text=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown'
+    return f"{commit}-dirty" if dirty else commit
+
+
+def time_best(function, repeat):
+    """Return the best wall time of function over repeat calls, with its output silenced."""
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            function()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def bench_csv_parse(data_dir, repeat):
+    processor = MultiServerEventProcessor(log_level='WARNING', metrics_dir=None)
+    with contextlib.redirect_stdout(io.StringIO()):
+        _, csv_files = file_utils.scan_directory(data_dir)
+    return time_best(lambda: [processor.read_and_group_events_by_server(path) for path in csv_files], repeat)
+
+
+def bench_coverage(data_dir, repeat):
+    processor = MultiServerEventProcessor(log_level='WARNING', metrics_dir=None)
+    with contextlib.redirect_stdout(io.StringIO()):
+        zip_files_by_server, csv_files = file_utils.scan_directory(data_dir)
+        events_by_server = {}
+        for path in csv_files:
+            events_by_server.update(processor.read_and_group_events_by_server(path))
+
+    def run():
+        for server_id, events in events_by_server.items():
+            coverage_analyzer.check_coverage_for_server(server_id, events, zip_files_by_server.get(server_id, []))
+
+    return time_best(run, repeat)
+
+
+def bench_extract_screenshot(data_dir, scratch_dir, repeat, videos=20):
+    """Time extract_screenshot per video, on videos spooled out of the fixture archives."""
+    video_paths = []
+    for filename in sorted(os.listdir(data_dir)):
+        if not filename.endswith('.zip'):
+            continue
+        with zipfile.ZipFile(os.path.join(data_dir, filename)) as archive:
+            for member in archive.namelist():
+                if member.endswith('.mkv') and len(video_paths) < videos:
+                    video_path = os.path.join(scratch_dir, f"video_{len(video_paths)}.mkv")
+                    with open(video_path, 'wb') as f:
+                        f.write(archive.read(member))
+                    video_paths.append(video_path)
+
+    def run():
+        for index, video_path in enumerate(video_paths):
+            extract_screenshot(video_path, os.path.join(scratch_dir, f"screenshot_{index}.png"), 13)
+
+    return time_best(run, repeat) / max(1, len(video_paths))
+
+
+def bench_excel(scratch_dir, rows, repeat):
+    data = [
+        {
+            'Server': f"server{i % 8:02d}", 'Name': f"server{i % 8:02d}-{i % 4}", 'Description': 'WRONGWAY',
+            'Date/Time': '16/07/2025 12:00:00', 'End Date/Time': '16/07/2025 12:03:00', 'True Event': 'UNMARKED_EVT',
+            'Data Intervento': '', 'Attività svolta': '', 'Screenshot': f"server{i % 8:02d}/screenshots/event_{i}.png"
+        }
+        for i in range(rows)
+    ]
+    return time_best(lambda: excel_report.create_excel_with_links(data, os.path.join(scratch_dir, "bench.xlsx")), repeat)
+
+
+def bench_end_to_end(data_dir, scratch_dir, repeat):
+    """Time a full run without screenshot cache or resume, so every event is decoded."""
+    def run():
+        run_dir = tempfile.mkdtemp(dir=scratch_dir)
+        previous_dir = os.getcwd()
+        os.chdir(run_dir)  # Output folders are created in the working directory
+        try:
+            processor = MultiServerEventProcessor(
+                screenshot_cache_dir=None, resume=False, policies=POLICIES,
+                log_level='WARNING', metrics_dir=None
+            )
+            processor.process_multiple_servers(os.path.abspath(data_dir))
+        finally:
+            os.chdir(previous_dir)
+
+    return time_best(run, repeat)
+
+
+def compare(results, baseline_path):
+    with open(baseline_path, encoding='utf-8') as f:
+        baseline = json.load(f)
+
+    print(f"\nCompared with {baseline['commit']} ({baseline['scale']}):")
+    for name, seconds in results['timings'].items():
+        before = baseline['timings'].get(name)
+        if before:
+            print(f"  {name:<24} {before:>10.4f}s -> {seconds:>10.4f}s ({(seconds / before - 1) * 100:+.1f}%)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--scale', choices=list(SCALES), default='small')
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--compare', metavar='COMMIT', help="Commit whose saved results to compare with")
+    parser.add_argument('--no-save', action='store_true', help="Do not save the results")
+    args = parser.parse_args()
+
+    scale = SCALES[args.scale]
+
+    with tempfile.TemporaryDirectory() as scratch_dir:
+        data_dir = os.path.join(scratch_dir, "data")
+        print(f"Generating {args.scale} fixture...")
+        counts = generate_fixture(
+            data_dir, servers=scale['servers'], zips_per_server=scale['zips_per_server'],
+            events_per_zip=scale['events_per_zip']
+        )
+
+        timings = {
+            'csv_parse': bench_csv_parse(data_dir, args.repeat),
+            'coverage': bench_coverage(data_dir, args.repeat),
+            'extract_screenshot': bench_extract_screenshot(data_dir, scratch_dir, args.repeat),
+            'excel_write': bench_excel(scratch_dir, scale['excel_rows'], args.repeat),
+            'end_to_end': bench_end_to_end(data_dir, scratch_dir, args.repeat),
+        }
+
+    results = {
+        'commit': current_commit(),
+        'scale': args.scale,
+        'fixture': dict(counts, excel_rows=scale['excel_rows']),
+        'repeat': args.repeat,
+        'python': platform.python_version(),
+        'machine': f"{platform.system()} {platform.machine()}, {os.cpu_count()} CPUs",
+        'recorded_at': time.strftime("%Y-%m-%dT%H:%M:%S"),
+        'timings': timings,
+    }
+
+    print(f"\nCommit {results['commit']}, scale {args.scale} ({counts['events']} events, best of {args.repeat}):")
+    for name, seconds in timings.items():
+        unit = " per video" if name == 'extract_screenshot' else ""
+        print(f"  {name:<24} {seconds:>10.4f}s{unit}")
+
+    if not args.no_save:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        results_path = os.path.join(RESULTS_DIR, f"{results['commit']}_{args.scale}.json")
+        with open(results_path, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+        print(f"\nResults saved: {results_path}")
+
+    if args.compare:
+        baseline_path = os.path.join(RESULTS_DIR, f"{args.compare}_{args.scale}.json")
+        if os.path.exists(baseline_path):
+            compare(results, baseline_path)
+        else:
+            print(f"\nNo saved results for {args.compare} at scale {args.scale}")
+
+
+if __name__ == "__main__":
+    main()
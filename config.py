@@ -1,8 +1,108 @@
 # Configuration constants
 DEFAULT_SCREENSHOT_TIMESTAMP = 13
+# Several frames per event, taken in one decode pass, e.g. [5, 13, 20] (None = default only)
+SCREENSHOT_TIMESTAMPS = None
 SUPPORTED_VIDEO_FORMATS = ['.mkv']
 CSV_SEPARATORS = [';', ',']
 
+# How frames are located: 'legacy' (frame number from FPS), 'exact' (time-based
+# seek SEEK_PREROLL_SECONDS early, then decode forward) or 'fast' (time-based seek only)
+SEEK_MODE = 'legacy'
+SEEK_PREROLL_SECONDS = 2.0
+
+# Best-frame selection: save the sharpest, most active frame within
+# BEST_FRAME_WINDOW_SECONDS either side of each screenshot timestamp (e.g. 5 picks
+# from 8-18 s around 13 s) instead of the frame at the timestamp (None disables it).
+# Frames are scored at BEST_FRAME_SCORE_WIDTH pixels wide on sharpness (Laplacian
+# variance) plus BEST_FRAME_MOTION_WEIGHT times motion (difference to the
+# neighbouring candidates). Cost cap per screenshot: the window shrinks to at most
+# BEST_FRAME_MAX_FRAMES decoded frames, of which at most BEST_FRAME_CANDIDATES are
+# scored (only as thumbnails; the best one is decoded again at full resolution)
+BEST_FRAME_WINDOW_SECONDS = None
+BEST_FRAME_MAX_FRAMES = 150
+BEST_FRAME_CANDIDATES = 12
+BEST_FRAME_SCORE_WIDTH = 320
+BEST_FRAME_MOTION_WEIGHT = 0.5
+
+# Near-duplicate screenshots: events of the same sensor whose first screenshots'
+# 64-bit difference hashes differ in at most DUPLICATE_HASH_DISTANCE bits share a
+# 'Duplicate Group' label in the reports (None disables the column). With
+# DUPLICATE_LINK, each duplicate's screenshot file becomes a hardlink to the first
+# screenshot of its group, so the group is stored once
+DUPLICATE_HASH_DISTANCE = 6
+DUPLICATE_LINK = False
+
+# Screenshot encoding: 'png', 'jpg' or 'webp'. Compression level (PNG, 0-9) and
+# quality (JPEG/WebP, 0-100) of None keep the OpenCV defaults; frames are
+# downscaled to SCREENSHOT_MAX_DIMENSION pixels on their longest side (None = full size)
+SCREENSHOT_FORMAT = 'png'
+SCREENSHOT_PNG_COMPRESSION = None
+SCREENSHOT_QUALITY = None
+SCREENSHOT_MAX_DIMENSION = None
+
+# Parallel screenshot extraction (None = one worker process per CPU core)
+EXTRACTION_WORKERS = None
+
+# ZIP files allowed to wait between pipeline stages (bounds spooled videos on disk)
+PIPELINE_QUEUE_DEPTH = 1
+
+# Threads writing screenshots, videos and snapshots to the output folders, and
+# the most writes allowed to be outstanding before the output stage waits
+OUTPUT_WORKERS = 4
+OUTPUT_QUEUE_DEPTH = 64
+
+# Where videos are spooled for decoding (None = temp_processing/ in the input
+# directory; e.g. a tmpfs or scratch NVMe mount) and the most bytes they may
+# take there at once (None = no limit). An archive is only extracted once its
+# videos, sized from the ZIP central directory, fit in what is left
+TEMP_ROOT = None
+TEMP_BUDGET_BYTES = None
+
+# Skip events already recorded in each output directory's processing manifest
+RESUME_FROM_MANIFEST = True
+
+# Persistent catalog of the ZIP files in each input directory (time range, media
+# listing, integrity), kept in ZIP_CATALOG_FILENAME there; None disables it.
+# ZIP_CATALOG_VERIFY_CRC also reads every member once to check its CRC, with
+# ZIP_CATALOG_WORKERS threads (None = one per CPU core plus 4, at most 32).
+# That reads each new archive in full, so it is off by default; corrupt media
+# is then reported when its event is extracted
+ZIP_CATALOG_FILENAME = "zip_catalog.sqlite"
+ZIP_CATALOG_VERIFY_CRC = False
+ZIP_CATALOG_WORKERS = None
+
+# Content-addressed screenshot cache (None disables it, e.g. os.path.join(os.path.expanduser("~"),
+# ".cache", "bcg-screenshot-processor", "screenshots")) and its size cap in bytes, enforced as
+# each server's reports are written
+SCREENSHOT_CACHE_DIR = None
+SCREENSHOT_CACHE_MAX_BYTES = 2 * 1024 ** 3
+
+# How spooled videos reach video/: 'auto' (detected per output directory),
+# 'move', 'hardlink', 'reflink', 'copy_file_range' or 'copy'
+MEDIA_EXPORT_STRATEGY = 'auto'
+
+# Answers to the processing prompts: 'ask' (interactive), 'yes' or 'no'
+PROMPT_POLICIES = {
+    'csv_only': 'ask',         # Merge CSV files when no ZIP files are found
+    'coverage_issues': 'ask',  # Continue the whole run when any server's merged events have coverage issues
+    'merged_report': 'ask',    # Create the merged report with all events
+}
+
+# Watch mode: seconds between directory polls, and how long a file must keep
+# the same size and mtime before it is treated as completely written
+WATCH_POLL_SECONDS = 30
+WATCH_SETTLE_SECONDS = 60
+
+# Level of the verbose per-event output: 'DEBUG', 'INFO' or 'WARNING' (quiet production runs)
+LOG_LEVEL = 'INFO'
+
+# Directory for per-run metrics files (stage timings, counters, bytes; None disables them)
+METRICS_DIR = 'metrics'
+
+# Report outputs: 'xlsx' (Excel with screenshot links), 'parquet' (needs pyarrow
+# or fastparquet) and/or 'sqlite' (events table indexed by server and timestamp)
+REPORT_FORMATS = ['xlsx']
+
 # Date/time formats for parsing
 DATETIME_FORMATS = [
     "%Y-%m-%d %H:%M:%S",  # Original format: 2025-06-12 23:49:33
@@ -1,8 +1,201 @@
+import argparse
+import json
 import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
 from src.event_processor import MultiServerEventProcessor
+from src.parallel_extraction import resolve_worker_count
+from src.watcher import FolderWatcher, watch
+from config import (
+    BEST_FRAME_WINDOW_SECONDS, DUPLICATE_LINK, EXTRACTION_WORKERS, LOG_LEVEL, TEMP_BUDGET_BYTES, TEMP_ROOT, WATCH_POLL_SECONDS, WATCH_SETTLE_SECONDS
+)
+
+# Options without effect on the interactive run, by argparse destination
+BATCH_ONLY_OPTIONS = {
+    '--csv-only': 'csv_only',
+    '--on-coverage-issues': 'on_coverage_issues',
+    '--merged-report': 'merged_report',
+    '--jobs': 'jobs',
+    '--summary-dir': 'summary_dir',
+    '--watch': 'watch',
+    '--poll-interval': 'poll_interval',
+    '--settle-seconds': 'settle_seconds',
+}
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Process BCG event reports. Without directories, runs interactively on 'data'."
+    )
+    parser.add_argument('directories', nargs='*', help="Input directories to process without prompts")
+    parser.add_argument('--csv-only', choices=['yes', 'no'], default='yes',
+                        help="Merge the CSV files of directories without ZIP files (default: yes)")
+    parser.add_argument('--on-coverage-issues', choices=['continue', 'skip'], default='continue',
+                        help="Process each directory whose merged events have coverage issues on any server, or skip "
+                             "the whole directory (default: continue)")
+    parser.add_argument('--merged-report', choices=['yes', 'no'], default='yes',
+                        help="Create the merged report of each directory (default: yes)")
+    parser.add_argument('--jobs', type=int, default=1,
+                        help="Directories processed at the same time (default: 1)")
+    parser.add_argument('--workers', type=int, default=EXTRACTION_WORKERS,
+                        help="Extraction worker processes shared by all directories (default: one per CPU)")
+    parser.add_argument('--summary-dir', default='.',
+                        help="Where to write the run_summary_<directory>.json files (default: current directory)")
+    parser.add_argument('--log-level', choices=['DEBUG', 'INFO', 'WARNING'], default=LOG_LEVEL,
+                        help=f"Verbosity of the per-event output (default: {LOG_LEVEL})")
+    parser.add_argument('--temp-root', default=TEMP_ROOT,
+                        help="Where videos are spooled for decoding, e.g. a tmpfs or scratch disk (default: the input directory)")
+    parser.add_argument('--temp-budget-gib', type=float,
+                        default=TEMP_BUDGET_BYTES / 1024 ** 3 if TEMP_BUDGET_BYTES else None,
+                        help="Most GiB of spooled videos at once, shared by all directories (default: no limit)")
+    parser.add_argument('--best-frame-window', type=float, default=BEST_FRAME_WINDOW_SECONDS,
+                        help="Save the best frame within this many seconds either side of each screenshot timestamp (default: the frame at the timestamp)")
+    parser.add_argument('--link-duplicates', action='store_true', default=DUPLICATE_LINK,
+                        help="Store near-duplicate screenshots of a sensor once, as hardlinks to the first of their group")
+    parser.add_argument('--watch', action='store_true',
+                        help="Keep running and process files as they land, into <directory>_live/")
+    parser.add_argument('--poll-interval', type=float, default=WATCH_POLL_SECONDS,
+                        help=f"Seconds between directory polls in watch mode (default: {WATCH_POLL_SECONDS})")
+    parser.add_argument('--settle-seconds', type=float, default=WATCH_SETTLE_SECONDS,
+                        help=f"Seconds a file must stay unchanged before it is processed (default: {WATCH_SETTLE_SECONDS})")
+    args = parser.parse_args(argv)
+    
+    # The interactive run prompts for its policies and writes no run summary
+    if not args.directories:
+        batch_only = [
+            option for option, dest in BATCH_ONLY_OPTIONS.items()
+            if getattr(args, dest) != parser.get_default(dest)
+        ]
+        if batch_only:
+            parser.error(f"{', '.join(batch_only)} need input directories")
+    return args
+
+def write_run_summary(processor, directory, success, error, elapsed_seconds, summary_dir):
+    """Write the JSON run summary of a processed directory."""
+    summary = {
+        'directory': os.path.abspath(directory),
+        'success': success,
+        'error': error,
+        'elapsed_seconds': round(elapsed_seconds, 3),
+        'extraction_workers': processor.extraction_workers,
+    }
+    summary.update(processor.run_summary())
+    
+    summary_path = os.path.join(summary_dir, f"run_summary_{os.path.basename(os.path.abspath(directory))}.json")
+    with open(summary_path, 'w', encoding='utf-8') as f:
+        json.dump(summary, f, indent=2, ensure_ascii=False)
+    print(f"🧾 Run summary written: {summary_path}")
+    
+    return summary
+
+def run_directory(directory, policies, extraction_workers, summary_dir, log_level, temp_root=TEMP_ROOT,
+                  temp_budget_bytes=TEMP_BUDGET_BYTES, best_frame_window=BEST_FRAME_WINDOW_SECONDS,
+                  link_duplicates=DUPLICATE_LINK):
+    """Process one input directory without prompts and write its JSON run summary."""
+    processor = MultiServerEventProcessor(
+        extraction_workers=extraction_workers, policies=policies, log_level=log_level,
+        temp_root=temp_root, temp_budget_bytes=temp_budget_bytes, best_frame_window=best_frame_window,
+        link_duplicates=link_duplicates
+    )
+    start = time.perf_counter()
+    error = None
+    
+    try:
+        success = processor.process_multiple_servers(directory)
+    except Exception as e:
+        success = False
+        error = f"{type(e).__name__}: {e}"
+        print(f"❌ Processing failed for {directory}: {error}")
+    
+    return write_run_summary(processor, directory, success, error, time.perf_counter() - start, summary_dir)
+
+def temp_budget_bytes(args):
+    """Return the temp disk budget of the command line in bytes, or None for no limit."""
+    return int(args.temp_budget_gib * 1024 ** 3) if args.temp_budget_gib else None
+
+def run_watch(args, policies):
+    """Watch the input directories and process new files as they land."""
+    watchers = [
+        FolderWatcher(
+            directory,
+            MultiServerEventProcessor(
+                extraction_workers=args.workers, policies=policies, log_level=args.log_level,
+                temp_root=args.temp_root, temp_budget_bytes=temp_budget_bytes(args),
+                best_frame_window=args.best_frame_window, link_duplicates=args.link_duplicates,
+                # A fixed output folder keeps one manifest and one set of reports per directory
+                output_name=f"{os.path.basename(os.path.abspath(directory))}_live"
+            ),
+            settle_seconds=args.settle_seconds
+        )
+        for directory in args.directories
+    ]
+    
+    def on_run(watcher, success, elapsed_seconds):
+        write_run_summary(watcher.processor, watcher.directory, success, None, elapsed_seconds, args.summary_dir)
+    
+    watch(watchers, poll_interval=args.poll_interval, on_run=on_run)
+    return 0
+
+def run_batch(args):
+    """Process several input directories concurrently within one worker budget."""
+    missing = [directory for directory in args.directories if not os.path.isdir(directory)]
+    if missing:
+        print(f"Directory not found: {', '.join(missing)}")
+        return 1
+    
+    # Output folders and summaries are named after the directory, so names must be unique
+    names = [os.path.basename(os.path.abspath(directory)) for directory in args.directories]
+    duplicates = sorted({name for name in names if names.count(name) > 1})
+    if duplicates:
+        print(f"Input directories must have distinct names, found: {', '.join(duplicates)}")
+        return 1
+    
+    policies = {
+        'csv_only': args.csv_only,
+        'coverage_issues': 'yes' if args.on_coverage_issues == 'continue' else 'no',
+        'merged_report': args.merged_report,
+    }
+    
+    os.makedirs(args.summary_dir, exist_ok=True)
+    
+    # Watched directories are polled one after the other, each with the whole worker budget
+    if args.watch:
+        return run_watch(args, policies)
+    
+    # Split the worker and temp disk budgets over the directories running at the same time
+    jobs = max(1, min(args.jobs, len(args.directories)))
+    extraction_workers = max(1, resolve_worker_count(args.workers) // jobs)
+    job_temp_budget = temp_budget_bytes(args) // jobs if args.temp_budget_gib else None
+    
+    print(f"🚀 Processing {len(args.directories)} directories, {jobs} at a time with {extraction_workers} worker(s) each")
+    
+    with ThreadPoolExecutor(max_workers=jobs) as executor:
+        summaries = list(executor.map(
+            lambda directory: run_directory(
+                directory, policies, extraction_workers, args.summary_dir, args.log_level, args.temp_root, job_temp_budget,
+                args.best_frame_window, args.link_duplicates
+            ),
+            args.directories
+        ))
+    
+    failed = [summary['directory'] for summary in summaries if not summary['success']]
+    if failed:
+        print(f"❌ {len(failed)} of {len(summaries)} directories failed: {', '.join(failed)}")
+        return 1
+    
+    print(f"✅ All {len(summaries)} directories processed")
+    return 0
 
 def main():
-    processor = MultiServerEventProcessor()
+    args = parse_args()
+    if args.directories:
+        sys.exit(run_batch(args))
+    
+    processor = MultiServerEventProcessor(
+        extraction_workers=args.workers, log_level=args.log_level, temp_root=args.temp_root,
+        temp_budget_bytes=temp_budget_bytes(args), best_frame_window=args.best_frame_window,
+        link_duplicates=args.link_duplicates
+    )
     
     # Default to data directory
     default_directory = "data"
@@ -1,5 +1,117 @@
+import logging
+from bisect import bisect_left, bisect_right
 from datetime import timedelta
 
+logger = logging.getLogger(__name__)
+
+# Gaps shorter than this between ZIP time ranges are ignored
+MIN_GAP_DURATION = timedelta(minutes=1)
+
+# Uncovered events listed individually in the coverage summary
+MAX_LISTED_UNCOVERED_EVENTS = 20
+
+# Events with missing or corrupt media listed individually in the coverage summary
+MAX_LISTED_MEDIA_ISSUES = 20
+
+
+class ZipIntervalIndex:
+    """
+    Sorted index over the time ranges of a server's ZIP files.
+
+    Lookups return the first ZIP file (in start-time order) whose range
+    contains the given time, in O(log n) instead of scanning every ZIP.
+    """
+    
+    def __init__(self, zip_files):
+        # Stable sort keeps the original order for ZIPs starting at the same time
+        self.zip_files = sorted(zip_files, key=lambda zf: zf['start_datetime'])
+        self.starts = [zf['start_datetime'] for zf in self.zip_files]
+        
+        # Running maximum of end times, non-decreasing so it can be bisected
+        self.max_ends = []
+        for zf in self.zip_files:
+            end = zf['end_datetime']
+            if self.max_ends and self.max_ends[-1] > end:
+                end = self.max_ends[-1]
+            self.max_ends.append(end)
+    
+    def find(self, event_time):
+        """Return the first ZIP file covering event_time, or None."""
+        # Only ZIPs starting at or before the event can cover it
+        candidates = bisect_right(self.starts, event_time)
+        
+        # The first ZIP whose running max end reaches the event is the
+        # first one that itself ends at or after the event
+        position = bisect_left(self.max_ends, event_time, 0, candidates)
+        
+        if position < candidates:
+            return self.zip_files[position]
+        return None
+
+
+def merge_time_ranges(zip_files):
+    """Merge overlapping ZIP time ranges into sorted (start, end) tuples."""
+    merged = []
+    
+    for zf in sorted(zip_files, key=lambda zf: zf['start_datetime']):
+        start, end = zf['start_datetime'], zf['end_datetime']
+        if merged and start <= merged[-1][1]:
+            if end > merged[-1][1]:
+                merged[-1] = (merged[-1][0], end)
+        else:
+            merged.append((start, end))
+    
+    return merged
+
+
+def find_coverage_gaps(zip_files):
+    """Find gaps between the merged time ranges of a server's ZIP files."""
+    gaps = []
+    merged = merge_time_ranges(zip_files)
+    
+    for (_, current_end), (next_start, _) in zip(merged, merged[1:]):
+        gap_duration = next_start - current_end
+        if gap_duration > MIN_GAP_DURATION:  # Ignore small gaps
+            gaps.append({
+                'start': current_end,
+                'end': next_start,
+                'duration': gap_duration
+            })
+    
+    return gaps
+
+def find_media_issues(events_by_zip, zip_files):
+    """
+    List covered events whose media the ZIP catalog shows as missing or corrupt.
+    
+    Only ZIP files scanned with a catalog carry a media listing; the others
+    are not checked here and fail later, at extraction time.
+    """
+    zip_files_by_name = {zf['filename']: zf for zf in zip_files}
+    media_issues = []
+    
+    for zip_filename, zip_events in events_by_zip.items():
+        zip_info = zip_files_by_name[zip_filename]
+        media = zip_info.get('media')
+        if media is None:
+            continue
+        
+        for event in zip_events:
+            entry = media.get(event.zip_media_index)
+            if not media and zip_info['integrity'] != 'ok':
+                issue = f"unreadable archive ({zip_info['integrity_error']})"
+            elif entry is None:
+                issue = f"media folder {event.zip_media_index} missing"
+            elif entry['corrupt']:
+                issue = f"media folder {event.zip_media_index} corrupt"
+            elif not entry['video_size']:
+                issue = f"no video in media folder {event.zip_media_index}"
+            else:
+                continue
+            media_issues.append({'event': event, 'zip_file': zip_filename, 'issue': issue})
+    
+    return media_issues
+
 def check_coverage_for_server(server_id, events, zip_files):
     """Check if ZIP files cover all events for a specific server."""
     print(f"\n=== Coverage Analysis for Server: {server_id} ===")
@@ -12,6 +124,7 @@ def check_coverage_for_server(server_id, events, zip_files):
             'total_events': len(events),
             'covered_events': [],
             'uncovered_events': events,
+            'media_issues': [],
             'gaps': [],
             'zip_files': []
         }
@@ -19,77 +132,78 @@ def check_coverage_for_server(server_id, events, zip_files):
     # Check coverage and assign ZIP-specific media indices
     covered_events = []
     uncovered_events = []
-    gaps = []
+    zip_index = ZipIntervalIndex(zip_files)
     
     # Group events by ZIP file first to assign correct media indices
     events_by_zip = {}
     
     for event in events:
-        event_time = event['datetime_obj']
-        covered = False
+        zip_info = zip_index.find(event.datetime_obj)
         
-        for zip_info in zip_files:
-            if zip_info['start_datetime'] <= event_time <= zip_info['end_datetime']:
-                zip_filename = zip_info['filename']
-                if zip_filename not in events_by_zip:
-                    events_by_zip[zip_filename] = []
-                
-                # Assign media index relative to this specific ZIP file
-                zip_media_index = len(events_by_zip[zip_filename])
-                event['zip_media_index'] = zip_media_index
-                
-                events_by_zip[zip_filename].append(event)
-                covered_events.append({
-                    'event': event,
-                    'zip_file': zip_filename
-                })
-                covered = True
-                break
-        
-        if not covered:
+        if zip_info is None:
             uncovered_events.append(event)
+            continue
+        
+        zip_filename = zip_info['filename']
+        if zip_filename not in events_by_zip:
+            events_by_zip[zip_filename] = []
+        events_by_zip[zip_filename].append(event)
+        
+        covered_events.append({
+            'event': event,
+            'zip_file': zip_filename
+        })
+    
+    # Assign media indices relative to each specific ZIP file, in event order
+    for zip_events in events_by_zip.values():
+        for zip_media_index, event in enumerate(zip_events):
+            event.zip_media_index = zip_media_index
     
-    # Find gaps between ZIP files
-    if len(zip_files) > 1:
-        for i in range(len(zip_files) - 1):
-            current_end = zip_files[i]['end_datetime']
-            next_start = zip_files[i + 1]['start_datetime']
-            
-            if current_end < next_start:
-                gap_duration = next_start - current_end
-                if gap_duration > timedelta(minutes=1):  # Ignore small gaps
-                    gaps.append({
-                        'start': current_end,
-                        'end': next_start,
-                        'duration': gap_duration
-                    })
+    # Flag missing or corrupt media before anything is extracted
+    media_issues = find_media_issues(events_by_zip, zip_files)
+    
+    # Find gaps between merged ZIP time ranges
+    gaps = find_coverage_gaps(zip_files)
     
     # Print summary
     print(f"Covered events: {len(covered_events)}/{len(events)}")
     print(f"Uncovered events: {len(uncovered_events)}")
     print(f"Time gaps: {len(gaps)}")
+    if media_issues:
+        print(f"Media issues: {len(media_issues)}")
     
     # Debug: Show events per ZIP
     for zip_filename, zip_events in events_by_zip.items():
-        print(f"DEBUG: {zip_filename}: {len(zip_events)} events (media indices 0-{len(zip_events)-1})")
+        logger.debug(f"{zip_filename}: {len(zip_events)} events (media indices 0-{len(zip_events)-1})")
     
     if uncovered_events:
         print("⚠️  UNCOVERED EVENTS:")
-        for event in uncovered_events:
-            print(f"  - {event['Name']} at {event['Date/Time']}")
+        for event in uncovered_events[:MAX_LISTED_UNCOVERED_EVENTS]:
+            print(f"  - {event.name} at {event.date_time}")
+        if len(uncovered_events) > MAX_LISTED_UNCOVERED_EVENTS:
+            print(f"  ... and {len(uncovered_events) - MAX_LISTED_UNCOVERED_EVENTS} more")
+    
+    if media_issues:
+        print("⚠️  MEDIA ISSUES:")
+        for media_issue in media_issues[:MAX_LISTED_MEDIA_ISSUES]:
+            event = media_issue['event']
+            print(f"  - {event.name} at {event.date_time}: {media_issue['issue']} in {media_issue['zip_file']}")
+        if len(media_issues) > MAX_LISTED_MEDIA_ISSUES:
+            print(f"  ... and {len(media_issues) - MAX_LISTED_MEDIA_ISSUES} more")
     
     if gaps:
         print("⚠️  TIME GAPS:")
         for gap in gaps:
             print(f"  - {gap['start']} to {gap['end']} (Duration: {gap['duration']})")
     
-    if len(covered_events) == len(events) and not gaps:
+    if len(covered_events) == len(events) and not gaps and not media_issues:
         print("✅ Complete coverage!")
     
     return {
         'total_events': len(events),
         'covered_events': covered_events,
         'uncovered_events': uncovered_events,
+        'media_issues': media_issues,
         'gaps': gaps,
         'zip_files': zip_files,
         'events_by_zip': events_by_zip
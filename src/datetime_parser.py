@@ -0,0 +1,46 @@
+import pandas as pd
+from config import DATETIME_FORMATS
+
+
+class DateTimeParser:
+    """
+    Datetime parser that learns the format of the column it is used on.
+
+    The first value that parses fixes the learned format, which is tried
+    first from then on; the other formats are only tried when a value does
+    not match it. The configured formats must not overlap (no string may
+    match two of them), which holds for config.DATETIME_FORMATS, so the
+    result is the same as trying every format in order.
+    """
+
+    def __init__(self, formats=DATETIME_FORMATS):
+        self.formats = list(formats)
+        self.learned_format = None
+
+    def _candidate_formats(self):
+        """Return the formats to try, learned format first."""
+        if self.learned_format is None:
+            return self.formats
+        return [self.learned_format] + [fmt for fmt in self.formats if fmt != self.learned_format]
+
+    def parse_series(self, values):
+        """
+        Parse a pandas Series of datetime strings in vectorized batches.
+
+        Each format is applied only to the values still unparsed, starting
+        with the learned format. Unparseable values are returned as NaT.
+        """
+        parsed = pd.Series(pd.NaT, index=values.index, dtype='datetime64[ns]')
+
+        for fmt in self._candidate_formats():
+            remaining = parsed.isna()
+            if not remaining.any():
+                break
+
+            batch = pd.to_datetime(values[remaining], format=fmt, errors='coerce')
+            if batch.notna().any():
+                parsed[remaining] = batch
+                if self.learned_format is None:
+                    self.learned_format = fmt
+
+        return parsed
@@ -0,0 +1,43 @@
+import threading
+
+
+class DiskBudget:
+    """
+    Byte budget for the videos spooled to the temp directory.
+
+    The prepare stage reserves an archive's footprint (the uncompressed
+    sizes of the videos it is about to spool, read from the ZIP central
+    directory) before extracting anything, and waits while that would
+    exceed the budget. The output stage releases it as soon as the
+    archive's temp tree has been removed. An archive larger than the whole
+    budget is admitted once nothing else is reserved, so it runs alone
+    rather than never.
+    """
+
+    def __init__(self, limit_bytes=None):
+        self.limit_bytes = limit_bytes  # None only tracks usage
+        self.reserved_bytes = 0
+        self.peak_bytes = 0
+        self.waits = 0  # Reservations that had to wait for space
+        self._condition = threading.Condition()
+
+    def _fits(self, size):
+        return self.limit_bytes is None or self.reserved_bytes == 0 or self.reserved_bytes + size <= self.limit_bytes
+
+    def acquire(self, size):
+        """Reserve size bytes, blocking until they fit in the budget."""
+        with self._condition:
+            if not self._fits(size):
+                self.waits += 1
+                self._condition.wait_for(lambda: self._fits(size))
+            self.reserved_bytes += size
+            self.peak_bytes = max(self.peak_bytes, self.reserved_bytes)
+
+    def release(self, size):
+        """Give back bytes reserved with acquire."""
+        with self._condition:
+            self.reserved_bytes -= size
+            self._condition.notify_all()
+
+    def stats(self):
+        return {'budget_bytes': self.limit_bytes, 'peak_bytes': self.peak_bytes, 'waits': self.waits}
@@ -0,0 +1,159 @@
+import sys
+from collections.abc import Mapping
+
+# Format of the 'Date/Time' and 'End Date/Time' report columns
+REPORT_DATETIME_FORMAT = "%d/%m/%Y %H:%M:%S"
+
+# Report columns before the screenshot columns
+REPORT_COLUMNS = (
+    'Server', 'Name', 'Description', 'Date/Time', 'End Date/Time', 'True Event', 'Data Intervento', 'Attività svolta'
+)
+
+# Report column after the screenshot columns, labelling near-duplicate screenshots
+DUPLICATE_GROUP_COLUMN = 'Duplicate Group'
+
+
+def intern_value(value):
+    """Intern a repeated CSV value (server, sensor name, description) so events share one copy."""
+    return sys.intern(value) if isinstance(value, str) else ''
+
+
+class Event:
+    """
+    One CSV event, keeping only the fields the processing needs.
+
+    Server IDs, sensor names, descriptions and 'True Event' values repeat
+    across events and are interned, so millions of events share a handful
+    of strings instead of each holding a full CSV row dict.
+    """
+
+    __slots__ = (
+        'server_id', 'name', 'description', 'date_time', 'datetime_obj', 'end_datetime_obj', 'true_event',
+        'zip_media_index'
+    )
+
+    def __init__(self, server_id, name, description, date_time, datetime_obj, end_datetime_obj=None, true_event=''):
+        self.server_id = server_id
+        self.name = name
+        self.description = description
+        self.date_time = date_time  # Date/Time as written in the CSV, for messages
+        self.datetime_obj = datetime_obj
+        self.end_datetime_obj = end_datetime_obj  # None when missing or unparseable
+        self.true_event = true_event
+        self.zip_media_index = None  # Media folder in its ZIP file, set by the coverage analysis
+
+    def __repr__(self):
+        return f"Event({self.name!r}, {self.description!r}, {self.datetime_obj!r})"
+
+
+class ReportRow(Mapping):
+    """
+    Report row of an event, computed from the event on access.
+
+    Behaves as a read-only dict of the report columns, so the Excel and
+    event store writers take it as they take dicts. The per-server and
+    merged reports hold the same row objects; the server report simply
+    leaves out the 'Server' column.
+    """
+
+    __slots__ = ('event', 'screenshots', 'columns', 'duplicate_group', 'screenshot_hash')
+
+    def __init__(self, event, screenshots, columns, screenshot_hash=None):
+        self.event = event
+        self.screenshots = screenshots  # Relative screenshot paths, or None in CSV-only mode
+        self.columns = columns  # Shared tuple of every column name, screenshot columns after REPORT_COLUMNS
+        self.duplicate_group = ''  # Set by the duplicate screenshot grouping
+        self.screenshot_hash = screenshot_hash  # Difference hash of the first screenshot, once computed
+
+    def __getitem__(self, column):
+        event = self.event
+        if column == 'Server':
+            return event.server_id
+        if column == 'Name':
+            return event.name
+        if column == 'Description':
+            return event.description
+        if column == 'Date/Time':
+            return event.datetime_obj.strftime(REPORT_DATETIME_FORMAT)
+        if column == 'End Date/Time':
+            return event.end_datetime_obj.strftime(REPORT_DATETIME_FORMAT) if event.end_datetime_obj else '-'
+        if column == 'True Event':
+            return event.true_event
+        if column in ('Data Intervento', 'Attività svolta'):
+            return ''
+        if column == DUPLICATE_GROUP_COLUMN:
+            return self.duplicate_group
+
+        try:
+            position = self.columns.index(column, len(REPORT_COLUMNS))
+        except ValueError:
+            raise KeyError(column) from None
+        return self.screenshots[position - len(REPORT_COLUMNS)] if self.screenshots else ''
+
+    def __iter__(self):
+        return iter(self.columns)
+
+    def __len__(self):
+        return len(self.columns)
+
+
+def _time_order(events):
+    """Return the time order of events: 'ascending', 'descending', 'mixed', or None with too few distinct times."""
+    ascending = descending = True
+    for previous, event in zip(events, events[1:]):
+        if event.datetime_obj < previous.datetime_obj:
+            ascending = False
+        elif event.datetime_obj > previous.datetime_obj:
+            descending = False
+    if ascending and descending:
+        return None
+    if not ascending and not descending:
+        return 'mixed'
+    return 'ascending' if ascending else 'descending'
+
+
+def merge_event_sets(event_sets):
+    """
+    Merge the per-server events of several CSV files into one deduplicated set.
+
+    Overlapping exports list the same event more than once; an event is
+    identified by its sensor name, description and timestamp, and the first
+    occurrence is kept. The media folders of a ZIP file are numbered in CSV
+    order, so that order is kept: a server listed in several files is only
+    re-sorted when every file lists it in the same direction (oldest-first
+    or newest-first), and then in that direction (stable, so simultaneous
+    events keep their CSV order). Otherwise its events stay in the order
+    first seen.
+
+    Args:
+        event_sets (list): {server_id: [Event, ...]} dicts, one per CSV file
+
+    Returns:
+        tuple: ({server_id: [Event, ...]}, number of duplicate events dropped)
+    """
+    merged = {}
+    seen = {}
+    orders = {}  # Time order of each file's events, per server
+    duplicates = 0
+
+    for events_by_server in event_sets:
+        for server_id, events in events_by_server.items():
+            server_events = merged.setdefault(server_id, [])
+            server_seen = seen.setdefault(server_id, set())
+            orders.setdefault(server_id, []).append(_time_order(events))
+            for event in events:
+                key = (event.name, event.description, event.datetime_obj)
+                if key in server_seen:
+                    duplicates += 1
+                    continue
+                server_seen.add(key)
+                server_events.append(event)
+
+    for server_id, server_events in merged.items():
+        if len(orders[server_id]) < 2:
+            continue
+        directions = {order for order in orders[server_id] if order is not None}
+        if len(directions) == 1 and 'mixed' not in directions:
+            server_events.sort(key=lambda event: event.datetime_obj, reverse=directions.pop() == 'descending')
+
+    return merged, duplicates
@@ -1,104 +1,228 @@
+import glob
+import logging
 import os
-import csv
+import re
 import shutil
-from datetime import datetime
+import sqlite3
+import tempfile
+import warnings
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+import pandas as pd
 from . import file_utils
 from . import coverage_analyzer
 from . import excel_report
+from . import event_store
 from . import summary_generator
-from .video_processing import extract_screenshot
-from config import DATETIME_FORMATS, DEFAULT_SCREENSHOT_TIMESTAMP
+from . import manifest
+from . import pipeline
+from . import screenshot_dedup
+from . import zip_media
+from .zip_catalog import ZipCatalog
+from .datetime_parser import DateTimeParser
+from .disk_budget import DiskBudget
+from .event_model import DUPLICATE_GROUP_COLUMN, Event, ReportRow, REPORT_COLUMNS, intern_value, merge_event_sets
+from .log_config import configure_logging
+from .metrics import RunMetrics
+from .output_writer import OutputWriter
+from .media_export import MediaExporter
+from .parallel_extraction import ScreenshotExtractor
+from .screenshot_cache import ScreenshotCache, member_digest
+from .video_processing import screenshot_extension
+from config import (
+    BEST_FRAME_CANDIDATES, BEST_FRAME_MAX_FRAMES, BEST_FRAME_MOTION_WEIGHT, BEST_FRAME_SCORE_WIDTH,
+    BEST_FRAME_WINDOW_SECONDS, DEFAULT_SCREENSHOT_TIMESTAMP, DUPLICATE_HASH_DISTANCE, DUPLICATE_LINK, EXTRACTION_WORKERS, LOG_LEVEL, MEDIA_EXPORT_STRATEGY, METRICS_DIR,
+    OUTPUT_QUEUE_DEPTH, OUTPUT_WORKERS, PIPELINE_QUEUE_DEPTH, PROMPT_POLICIES, REPORT_FORMATS, RESUME_FROM_MANIFEST, SCREENSHOT_CACHE_DIR,
+    SCREENSHOT_CACHE_MAX_BYTES, SCREENSHOT_FORMAT, SCREENSHOT_MAX_DIMENSION,
+    SCREENSHOT_PNG_COMPRESSION, SCREENSHOT_QUALITY, SCREENSHOT_TIMESTAMPS, SEEK_MODE,
+    SEEK_PREROLL_SECONDS, SUPPORTED_VIDEO_FORMATS, TEMP_BUDGET_BYTES, TEMP_ROOT, ZIP_CATALOG_FILENAME
+)
+
+logger = logging.getLogger(__name__)
+
+# Metrics stage names of the steps timed inside extraction workers
+WORKER_STAGES = {
+    'open': 'video_open', 'seek': 'video_seek', 'decode': 'video_decode', 'score': 'frame_scoring', 'encode': 'image_encode'
+}
 
 class MultiServerEventProcessor:
-    def __init__(self, screenshot_timestamp=DEFAULT_SCREENSHOT_TIMESTAMP):
+    def __init__(self, screenshot_timestamp=DEFAULT_SCREENSHOT_TIMESTAMP, screenshot_timestamps=SCREENSHOT_TIMESTAMPS,
+                 extraction_workers=EXTRACTION_WORKERS,
+                 pipeline_queue_depth=PIPELINE_QUEUE_DEPTH, resume=RESUME_FROM_MANIFEST,
+                 screenshot_cache_dir=SCREENSHOT_CACHE_DIR, media_export_strategy=MEDIA_EXPORT_STRATEGY,
+                 seek_mode=SEEK_MODE, seek_preroll_seconds=SEEK_PREROLL_SECONDS,
+                 best_frame_window=BEST_FRAME_WINDOW_SECONDS,
+                 duplicate_hash_distance=DUPLICATE_HASH_DISTANCE, link_duplicates=DUPLICATE_LINK,
+                 screenshot_format=SCREENSHOT_FORMAT, screenshot_png_compression=SCREENSHOT_PNG_COMPRESSION,
+                 screenshot_quality=SCREENSHOT_QUALITY, screenshot_max_dimension=SCREENSHOT_MAX_DIMENSION,
+                 report_formats=REPORT_FORMATS, policies=None, output_name=None,
+                 log_level=LOG_LEVEL, metrics_dir=METRICS_DIR, zip_catalog_filename=ZIP_CATALOG_FILENAME,
+                 temp_root=TEMP_ROOT, temp_budget_bytes=TEMP_BUDGET_BYTES,
+                 output_workers=OUTPUT_WORKERS, output_queue_depth=OUTPUT_QUEUE_DEPTH):
         self.screenshot_timestamp = screenshot_timestamp
+        # Timestamps taken per event in one decode pass (None = just screenshot_timestamp)
+        self.screenshot_timestamps = list(screenshot_timestamps) if screenshot_timestamps else [screenshot_timestamp]
+        # Near-duplicate screenshot grouping (None disables it) and hardlinking of the duplicates
+        self.duplicate_hash_distance = duplicate_hash_distance
+        self.link_duplicates = link_duplicates
+        self.duplicate_stats = {'screenshots': 0, 'duplicates': 0, 'groups': 0, 'linked': 0, 'bytes_freed': 0}
+        self.row_columns = REPORT_COLUMNS + tuple(self._screenshot_columns())  # Shared by every report row
+        if duplicate_hash_distance is not None:
+            self.row_columns += (DUPLICATE_GROUP_COLUMN,)
+        self.seek_mode = seek_mode  # 'legacy', 'exact' or 'fast' (see video_processing.extract_screenshots)
+        self.seek_preroll_seconds = seek_preroll_seconds
+        # Best-frame selection around each timestamp (None saves the frame at the timestamp)
+        self.best_frame = {
+            'window_seconds': best_frame_window, 'max_frames': BEST_FRAME_MAX_FRAMES,
+            'candidates': BEST_FRAME_CANDIDATES, 'score_width': BEST_FRAME_SCORE_WIDTH,
+            'motion_weight': BEST_FRAME_MOTION_WEIGHT
+        } if best_frame_window else None
+        self.seek_stats = {'frames': 0, 'total_error': 0.0, 'max_error': 0.0}
+        self.extraction_workers = extraction_workers  # None uses one worker per CPU
+        self.pipeline_queue_depth = pipeline_queue_depth  # ZIP files buffered between pipeline stages
+        self.output_workers = output_workers  # Threads writing media to the output folders
+        self.output_queue_depth = output_queue_depth  # Output writes outstanding before the output stage waits
+        self._output_writer = None
+        self._pending_jobs = deque()  # ZIP jobs whose output writes may still be running, in pipeline order
+        self.temp_root = temp_root  # Where videos are spooled (None = temp_processing/ in the input directory)
+        self.temp_budget_bytes = temp_budget_bytes  # Most bytes spooled at once (None = no limit)
+        self.disk_budget = DiskBudget(temp_budget_bytes)
+        self.temp_stats = None
+        self.failed_archives = []  # ZIP files a pipeline stage failed on in the last run
+        self.resume = resume  # Skip events recorded in the output manifest by a previous run
+        self._manifests = {}  # Processing manifests by date-range output directory
+        # Part of the screenshot cache key; unset options are left out so keys stay stable
+        self.encode_options = {'format': screenshot_format}
+        for option, value in (('png_compression', screenshot_png_compression), ('quality', screenshot_quality),
+                              ('max_dimension', screenshot_max_dimension)):
+            if value is not None:
+                self.encode_options[option] = value
+        self.screenshot_extension = screenshot_extension(self.encode_options)
+        self.encode_stats = {'screenshots': 0, 'encode_seconds': 0.0, 'bytes_written': 0}
+        self.screenshot_cache = ScreenshotCache(screenshot_cache_dir, SCREENSHOT_CACHE_MAX_BYTES) if screenshot_cache_dir else None
+        self.cache_stats = {'hits': 0, 'misses': 0}
+        self.report_formats = list(report_formats)  # 'xlsx', 'parquet' and/or 'sqlite'
+        for report_format in self.report_formats:
+            if report_format != 'xlsx' and report_format not in event_store.EVENT_STORE_FORMATS:
+                raise ValueError(f"Unknown report format: {report_format}")
+        # Catalog of ZIP contents and integrity kept in each input directory (None disables it)
+        self.zip_catalog_filename = zip_catalog_filename
+        self.catalog_stats = None
+        self.media_exporter = MediaExporter(media_export_strategy)  # Strategy detected per output directory
+        # Answers to the interactive prompts: 'ask', 'yes' or 'no' (see config.PROMPT_POLICIES)
+        self.policies = dict(PROMPT_POLICIES, **(policies or {}))
+        self.report_paths = []  # Report files written by the last run
+        # Fixed output folder name; None names it '<start>_<end>_<input directory>' from the ZIP dates
+        self.output_name = output_name
+        self.exclude_files = set()  # Input filenames to leave out of the next scan (e.g. still being copied)
+        self.log_level = log_level  # Level of the verbose per-event output
+        configure_logging(log_level)
+        self.metrics_dir = metrics_dir  # Where per-run metrics files go (None disables them)
+        self.metrics = RunMetrics()
         self.event_categories_summary = {}  # Track categories across all servers
         self.all_excel_data = []  # Store all Excel data for merging
+        self.all_excel_datetimes = []  # Parsed Date/Time of each merged row, for sorting
+        self.datetime_parser = DateTimeParser()  # Learns the Date/Time column format
+        self.end_datetime_parser = DateTimeParser()  # Learns the End Date/Time column format
         self.input_directory_name = None  # Track input directory name for output naming
     
     def read_and_group_events_by_server(self, csv_path):
-        """Read events from CSV and group them by server."""
+        """Read events from CSV in one columnar pass and group them by server."""
         if not os.path.exists(csv_path):
             print(f"CSV file not found: {csv_path}")
             return {}
         
-        # Detect separator
-        with open(csv_path, 'r', encoding='utf-8-sig') as f:
+        with open(csv_path, 'r', encoding='utf-8-sig', newline='') as f:
+            # Detect separator from the header line, then parse the whole file
             first_line = f.readline()
             separator = ';' if ';' in first_line else ','
-            print(f"DEBUG: Detected separator: '{separator}'")
+            logger.debug(f"Detected separator: '{separator}'")
+            f.seek(0)
+            
+            # Rows with more fields than the header keep their leading fields, as csv.DictReader
+            # did; pandas reports them with a ParserWarning, or the C parser may reject them
+            with warnings.catch_warnings(record=True) as parser_warnings:
+                warnings.simplefilter('always', pd.errors.ParserWarning)
+                try:
+                    df = pd.read_csv(f, sep=separator, dtype=str, keep_default_na=False, index_col=False)
+                except pd.errors.EmptyDataError:
+                    print(f"Warning: {os.path.basename(csv_path)} is empty, no events read")
+                    return {}
+                except pd.errors.ParserError:
+                    f.seek(0)
+                    df = pd.read_csv(f, sep=separator, dtype=str, keep_default_na=False, index_col=False,
+                                     engine='python')
+            
+            if any(issubclass(warning.category, pd.errors.ParserWarning) for warning in parser_warnings):
+                print(f"Warning: Ignored extra fields beyond the header in {os.path.basename(csv_path)}")
+        
+        logger.debug(f"CSV headers: {list(df.columns)}")
+        
+        # Get sensor name column - handle both 'Name' and potential BOM issues
+        name_column = next((column for column in df.columns if 'Name' in column), None)
+        if name_column is None:
+            print(f"Warning: No 'Name' column found in {os.path.basename(csv_path)}")
+            return {}
+        
+        # Store the clean sensor name
+        df['Name'] = df[name_column].str.strip()
+        
+        empty_names = df['Name'] == ''
+        if empty_names.any():
+            print(f"Warning: Empty sensor name in {empty_names.sum()} rows (first: row {empty_names.idxmax()})")
+        
+        # Extract server ID, once per distinct sensor name
+        server_by_name = {name: file_utils.extract_server_from_sensor_name(name) for name in df['Name'].dropna().unique()}
+        all_server_ids = df['Name'].map(server_by_name)
+        valid_server = all_server_ids.notna()
+        invalid_servers = ~valid_server & ~empty_names
+        if invalid_servers.any():
+            examples = df.loc[invalid_servers, 'Name'].unique()[:5]
+            print(f"Warning: Could not extract server ID from {invalid_servers.sum()} sensor names, e.g. {list(examples)}")
+        
+        # Parse datetime - try multiple formats
+        datetime_column = df['Date/Time'] if 'Date/Time' in df.columns else pd.Series('', index=df.index)
+        parsed_datetimes = self.datetime_parser.parse_series(datetime_column)
+        invalid_datetimes = parsed_datetimes.isna() & valid_server
+        if invalid_datetimes.any():
+            examples = datetime_column[invalid_datetimes].unique()[:5]
+            print(f"Warning: Could not parse datetime for {invalid_datetimes.sum()} rows, e.g. {list(examples)} - tried multiple formats")
         
-        # Read all events and group by server
+        keep = valid_server & parsed_datetimes.notna()
+        df = df[keep]
+        datetimes = parsed_datetimes[keep]
+        server_ids = all_server_ids[keep]
+        
+        # End Date/Time is optional; missing or unparseable values stay None
+        end_column = df['End Date/Time'] if 'End Date/Time' in df.columns else pd.Series('', index=df.index)
+        parsed_end_datetimes = self.end_datetime_parser.parse_series(end_column)
+        end_datetimes = pd.Series(parsed_end_datetimes.dt.to_pydatetime(), index=df.index, dtype=object)
+        end_datetimes = end_datetimes.where(parsed_end_datetimes.notna(), None)
+        true_events = df['True Event'] if 'True Event' in df.columns else pd.Series('', index=df.index)
+        descriptions = df['Description'] if 'Description' in df.columns else pd.Series('', index=df.index)
+        date_times = df['Date/Time'] if 'Date/Time' in df.columns else pd.Series('', index=df.index)
+        
+        # Group by server in order of first appearance, as compact event records
         events_by_server = {}
         
-        with open(csv_path, 'r', encoding='utf-8-sig') as f:
-            reader = csv.DictReader(f, delimiter=separator)
-            print(f"DEBUG: CSV headers: {reader.fieldnames}")
-            
-            for i, row in enumerate(reader):
-                # Get sensor name - handle both 'Name' and potential BOM issues
-                sensor_name = ''
-                for key in row.keys():
-                    if 'Name' in key:  # This will match both 'Name' and '\ufeffName'
-                        sensor_name = row[key].strip()
-                        break
-                
-                if not sensor_name:
-                    print(f"Warning: Empty sensor name in row {i}")
-                    continue
-                
-                # Extract server ID
-                server_id = file_utils.extract_server_from_sensor_name(sensor_name)
-                
-                if not server_id:
-                    print(f"Warning: Could not extract server ID from sensor name: '{sensor_name}'")
-                    continue
-                
-                # Debug first few rows
-                if i < 3:
-                    print(f"DEBUG: Row {i}: Sensor='{sensor_name}', Server='{server_id}'")
-                
-                # Parse datetime - try multiple formats
-                datetime_str = row.get('Date/Time', '')
-                event_datetime = self._parse_datetime(datetime_str)
-                
-                if event_datetime is None:
-                    print(f"Warning: Could not parse datetime for row {i}: {datetime_str} - tried multiple formats")
-                    continue
-                
-                row['datetime_obj'] = event_datetime
-                
-                # Initialize server group if not exists
-                if server_id not in events_by_server:
-                    events_by_server[server_id] = []
-                
-                # Store the clean sensor name and global index
-                row['Name'] = sensor_name
-                row['global_index'] = len(events_by_server[server_id])  # Global index for this server
-                
-                # Debug: Print True Event value for first few rows
-                if i < 3:
-                    print(f"DEBUG: True Event in CSV: '{row.get('True Event', 'NOT_FOUND')}'")
-                    print(f"DEBUG: All row keys: {list(row.keys())}")
-                
-                # Add to server group
-                events_by_server[server_id].append(row)
+        for server_id, group_index in server_ids.groupby(server_ids, sort=False).groups.items():
+            server_id = intern_value(server_id)
+            events_by_server[server_id] = [
+                Event(server_id, intern_value(name), intern_value(description), date_time, event_datetime,
+                      end_datetime, intern_value(true_event))
+                for name, description, date_time, event_datetime, end_datetime, true_event in zip(
+                    df['Name'].loc[group_index], descriptions.loc[group_index], date_times.loc[group_index],
+                    datetimes.loc[group_index].dt.to_pydatetime(), end_datetimes.loc[group_index],
+                    true_events.loc[group_index]
+                )
+            ]
         
         # Print summary
         for server_id, events in events_by_server.items():
-            print(f"DEBUG: Server {server_id}: {len(events)} events")
+            logger.debug(f"Server {server_id}: {len(events)} events")
         
         return events_by_server
     
-    def _parse_datetime(self, datetime_str):
-        """Parse datetime string with multiple possible formats."""
-        for fmt in DATETIME_FORMATS:
-            try:
-                return datetime.strptime(datetime_str, fmt)
-            except ValueError:
-                continue
-        return None
-    
     def process_multiple_servers(self, directory):
         """Main processing function for multiple servers and ZIP files."""
         print("🔍 Scanning directory...")
@@ -109,9 +233,27 @@ class MultiServerEventProcessor:
         # Reset summary data for new processing
         self.event_categories_summary = {}
         self.all_excel_data = []
+        self.all_excel_datetimes = []
+        self.cache_stats = {'hits': 0, 'misses': 0}
+        self.seek_stats = {'frames': 0, 'total_error': 0.0, 'max_error': 0.0}
+        self.encode_stats = {'screenshots': 0, 'encode_seconds': 0.0, 'bytes_written': 0}
+        self.duplicate_stats = {'screenshots': 0, 'duplicates': 0, 'groups': 0, 'linked': 0, 'bytes_freed': 0}
+        self.media_exporter.stats = {strategy: 0 for strategy in self.media_exporter.stats}
+        self.report_paths = []
+        self.catalog_stats = None
+        self.temp_stats = None
+        self.failed_archives = []
+        self.metrics = RunMetrics()
         
-        # Scan directory
-        zip_files_by_server, csv_files = file_utils.scan_directory(directory)
+        # Scan directory, taking unchanged ZIP files from the catalog
+        catalog = self._open_zip_catalog(directory)
+        try:
+            with self.metrics.timer('directory_scan'):
+                zip_files_by_server, csv_files = file_utils.scan_directory(directory, exclude=self.exclude_files, catalog=catalog)
+        finally:
+            if catalog:
+                self.catalog_stats = catalog.stats
+                catalog.close()
         
         if not csv_files:
             print("❌ No CSV files found!")
@@ -120,46 +262,52 @@ class MultiServerEventProcessor:
         # Ask user if they want to continue without ZIP files
         if not zip_files_by_server:
             print("❌ No ZIP files found!")
-            response = input("🤔 Do you want to merge the CSV files anyway (without videos/screenshots)? (y/n): ")
-            if response.lower() != 'y':
+            if not self._confirm('csv_only', "🤔 Do you want to merge the CSV files anyway (without videos/screenshots)? (y/n): "):
                 print("⏭️  Processing cancelled.")
                 return False
             print("📊 Continuing with CSV-only processing...")
         
-        # Process each CSV file
+        # Read every CSV first, so events listed in several overlapping exports are processed once
+        event_sets = []
         for csv_file in csv_files:
             print(f"\n📊 Processing CSV: {os.path.basename(csv_file)}")
             
             # Read and group events by server
-            events_by_server = self.read_and_group_events_by_server(csv_file)
+            with self.metrics.timer('csv_parse'):
+                events_by_server = self.read_and_group_events_by_server(csv_file)
+            self.metrics.count('events_read', sum(len(events) for events in events_by_server.values()))
             
             if not events_by_server:
                 print("❌ No events found in CSV!")
                 continue
             
             print(f"Found events for servers: {list(events_by_server.keys())}")
-            
-            # If we have ZIP files, do coverage analysis
+            event_sets.append(events_by_server)
+        
+        events_by_server, duplicates = merge_event_sets(event_sets)
+        if duplicates:
+            self.metrics.count('events_duplicate', duplicates)
+            print(f"\n🔁 Merged {len(event_sets)} CSV files: {duplicates} duplicate events skipped")
+        
+        coverage_reports = {}
+        if events_by_server:
+            # If we have ZIP files, do coverage analysis once for the whole run
             if zip_files_by_server:
                 # Check coverage for each server
-                coverage_reports = {}
                 for server_id, events in events_by_server.items():
                     zip_files = zip_files_by_server.get(server_id, [])
-                    coverage_reports[server_id] = coverage_analyzer.check_coverage_for_server(server_id, events, zip_files)
+                    with self.metrics.timer('coverage'):
+                        coverage_reports[server_id] = coverage_analyzer.check_coverage_for_server(server_id, events, zip_files)
                 
                 # Ask user to continue if there are issues
                 has_issues = any(
-                    len(report['uncovered_events']) > 0 or len(report['gaps']) > 0
+                    len(report['uncovered_events']) > 0 or len(report['gaps']) > 0 or len(report['media_issues']) > 0
                     for report in coverage_reports.values()
                 )
                 
-                if has_issues:
-                    response = input("\n⚠️  Coverage issues detected. Continue processing? (y/n): ")
-                    if response.lower() != 'y':
-                        continue
-                
-                # Process with ZIP files
-                self._process_with_zip_files(directory, coverage_reports)
+                if not has_issues or self._confirm('coverage_issues', "\n⚠️  Coverage issues detected. Continue processing? (y/n): "):
+                    # Process with ZIP files, opening each archive once
+                    self._process_with_zip_files(directory, coverage_reports)
             else:
                 # Process without ZIP files (CSV-only mode)
                 self._process_csv_only_mode(events_by_server)
@@ -172,41 +320,107 @@ class MultiServerEventProcessor:
             if not zip_files_by_server:
                 self.create_merged_report(None, csv_only=True)
             else:
-                merge_response = input("Do you want to create a merged Excel report with all events? (y/n): ").strip().lower()
-                if merge_response == 'y':
+                if self._confirm('merged_report', "Do you want to create a merged Excel report with all events? (y/n): "):
                     # Get date range from first coverage report if available
                     merged_report_date_range = None
-                    if 'coverage_reports' in locals():
-                        for report in coverage_reports.values():
-                            if report['zip_files']:
-                                start_date = min(zf['start_date'] for zf in report['zip_files'])
-                                end_date = max(zf['end_date'] for zf in report['zip_files'])
-                                merged_report_date_range = f"{start_date}_{end_date}_{self.input_directory_name}"
-                                break
-                    self.create_merged_report(merged_report_date_range)
+                    for report in coverage_reports.values():
+                        if report['zip_files']:
+                            start_date = min(zf['start_date'] for zf in report['zip_files'])
+                            end_date = max(zf['end_date'] for zf in report['zip_files'])
+                            merged_report_date_range = f"{start_date}_{end_date}_{self.input_directory_name}"
+                            break
+                    self.create_merged_report(self.output_name or merged_report_date_range)
                 else:
                     print("⏭️  Skipping merged report creation.")
         
         # Display final summary
         summary_generator.display_final_summary(self.event_categories_summary)
         
+        if self.screenshot_cache:
+            summary_generator.display_cache_summary(self.cache_stats)
+        summary_generator.display_seek_summary(self._frame_selection(), self.seek_stats)
+        summary_generator.display_encode_summary(self.encode_options, self.encode_stats)
+        summary_generator.display_duplicate_summary(self.duplicate_stats)
+        summary_generator.display_export_summary(self.media_exporter.stats)
+        if self.temp_stats:
+            summary_generator.display_temp_disk_summary(self.temp_stats)
+        
+        if self.metrics_dir:
+            metrics_path = self.metrics.write(self.metrics_dir, self.input_directory_name)
+            print(f"📈 Metrics written: {metrics_path}")
+        
+        if self.failed_archives:
+            print(f"\n❌ Processing completed with {len(self.failed_archives)} failed ZIP file(s):")
+            for failure in self.failed_archives:
+                print(f"   {failure['zip_file']} ({failure['stage']}): {failure['error']}")
+            return False
+        
         print("\n✅ Processing completed!")
         return True
     
+    def _frame_selection(self):
+        """Name how screenshot frames are chosen, for the summaries."""
+        if self.best_frame:
+            return f"best frame within ±{self.best_frame['window_seconds']}s"
+        return self.seek_mode
+    
+    def _confirm(self, policy, prompt):
+        """Answer a yes/no prompt from its policy, asking the user only when the policy is 'ask'."""
+        answer = self.policies.get(policy, 'ask')
+        if answer == 'ask':
+            return input(prompt).strip().lower() == 'y'
+        
+        print(f"{prompt.strip()} {'y' if answer == 'yes' else 'n'} ({policy} policy)")
+        return answer == 'yes'
+    
+    def run_summary(self):
+        """Return the statistics of the last run as a JSON-serializable dict."""
+        return {
+            'input_directory': self.input_directory_name,
+            'total_events': len(self.all_excel_data),
+            'event_categories': {
+                category: {'count': info['count'], 'servers': sorted(info['servers'])}
+                for category, info in self.event_categories_summary.items()
+            },
+            'reports': self.report_paths,
+            'screenshot_cache': self.cache_stats if self.screenshot_cache else None,
+            'seek': dict(self.seek_stats, mode=self._frame_selection()),
+            'encode': dict(self.encode_stats, options=self.encode_options),
+            'duplicates': dict(self.duplicate_stats, max_distance=self.duplicate_hash_distance),
+            'media_export': self.media_exporter.stats,
+            'zip_catalog': self.catalog_stats,
+            'temp_disk': self.temp_stats,
+            'failed_archives': self.failed_archives,
+            'metrics': self.metrics.summary()
+        }
+    
     def _process_with_zip_files(self, directory, coverage_reports):
-        """Process events with ZIP files (original functionality)."""
-        # Process each server
-        temp_base_dir = os.path.join(directory, "temp_processing")
-        os.makedirs(temp_base_dir, exist_ok=True)
+        """Process events with ZIP files through the staged archive pipeline."""
+        if self.temp_root:
+            # A private folder, as several runs may share the temp root
+            os.makedirs(self.temp_root, exist_ok=True)
+            temp_base_dir = tempfile.mkdtemp(prefix=f"temp_processing_{self.input_directory_name}_", dir=self.temp_root)
+        else:
+            temp_base_dir = os.path.join(directory, "temp_processing")
+            os.makedirs(temp_base_dir, exist_ok=True)
+        self.disk_budget = DiskBudget(self.temp_budget_bytes)
+        
+        extractor = ScreenshotExtractor(self.extraction_workers, log_level=self.log_level)
+        self._output_writer = OutputWriter(self.output_workers, self.output_queue_depth)
+        self._pending_jobs = deque()
+        
+        def decode_stage(prepared):
+            return self._decode_zip_job(prepared, extractor)
         
         try:
+            # Build one job per ZIP file, server by server
+            jobs = []
+            servers = []
             for server_id, report in coverage_reports.items():
                 if not report['covered_events']:
                     print(f"⚠️  No covered events for server {server_id}, skipping...")
                     continue
                 
-                print(f"\n🔄 Processing server: {server_id}")
-                
                 # Determine date range from ZIP files
                 zip_files = report['zip_files']
                 if not zip_files:
@@ -216,55 +430,72 @@ class MultiServerEventProcessor:
                 end_date = max(zf['end_date'] for zf in zip_files)
                 
                 # Create output structure with input directory name
-                date_range = f"{start_date}_{end_date}_{self.input_directory_name}"
+                date_range = self.output_name or f"{start_date}_{end_date}_{self.input_directory_name}"
                 output_dir = os.path.join(date_range, server_id)
-                screenshots_dir = os.path.join(output_dir, "screenshots")
-                videos_dir = os.path.join(output_dir, "video")
-                event_reports_dir = os.path.join(output_dir, "eventReports")
+                server_output = {
+                    'server_id': server_id,
+                    'date_range': date_range,
+                    'screenshots_dir': os.path.join(output_dir, "screenshots"),
+                    'videos_dir': os.path.join(output_dir, "video"),
+                    'event_reports_dir': os.path.join(output_dir, "eventReports"),
+                    'excel_data': [],
+                    'manifest': self._get_manifest(date_range)
+                }
                 
-                os.makedirs(screenshots_dir, exist_ok=True)
-                os.makedirs(videos_dir, exist_ok=True)
-                os.makedirs(event_reports_dir, exist_ok=True)
+                # A new ZIP file can widen the date range, which names a new output folder
+                if self.resume and not self.output_name:
+                    self._adopt_earlier_output(server_id, date_range, server_output['manifest'])
                 
-                excel_data = []
-                temp_dirs_to_cleanup = []
+                os.makedirs(server_output['screenshots_dir'], exist_ok=True)
+                os.makedirs(server_output['videos_dir'], exist_ok=True)
+                os.makedirs(server_output['event_reports_dir'], exist_ok=True)
+                servers.append(server_output)
                 
-                # Group covered events by ZIP file to minimize extractions
+                # Group covered events by ZIP file to minimize archive reads
                 events_by_zip = report['events_by_zip']
                 
-                # Process each ZIP file
-                for zip_filename, events_in_zip in events_by_zip.items():
-                    print(f"📦 Processing ZIP: {zip_filename} ({len(events_in_zip)} events)")
-                    
-                    # Find ZIP info
+                for position, (zip_filename, events_in_zip) in enumerate(events_by_zip.items()):
                     zip_info = next(z for z in zip_files if z['filename'] == zip_filename)
+                    zip_signature = manifest.archive_signature(zip_info)
                     
-                    # Extract ZIP
-                    media_dir, temp_dir = file_utils.extract_and_process_zip(zip_info, temp_base_dir)
-                    temp_dirs_to_cleanup.append(temp_dir)
+                    # Rebuild the report rows of events already processed from this archive
+                    if self.resume:
+                        completed_rows = [
+                            self._completed_row(server_output['manifest'], server_id, event, zip_signature)
+                            for event in events_in_zip
+                        ]
+                    else:
+                        completed_rows = [None] * len(events_in_zip)
                     
-                    if not media_dir:
-                        print(f"❌ Could not extract media from {zip_filename}")
-                        continue
-                    
-                    # Process events from this ZIP
-                    self._process_events_from_zip(
-                        events_in_zip, media_dir, server_id, 
-                        screenshots_dir, videos_dir, event_reports_dir, excel_data
-                    )
-                
-                # Create individual server Excel file
-                if excel_data:
-                    excel_path = os.path.join(date_range, f"{server_id}_events_report.xlsx")
-                    # Remove 'Server' column for individual reports
-                    individual_excel_data = [{k: v for k, v in row.items() if k != 'Server'} for row in excel_data]
-                    excel_report.create_excel_with_links(individual_excel_data, excel_path)
-                    print(f"📊 Excel file created: {excel_path}")
-                
-                # Cleanup temporary directories for this server
-                for temp_dir in temp_dirs_to_cleanup:
-                    if os.path.exists(temp_dir):
-                        shutil.rmtree(temp_dir)
+                    jobs.append({
+                        'server': server_output,
+                        'zip_info': zip_info,
+                        'zip_signature': zip_signature,
+                        'events': events_in_zip,
+                        'completed_rows': completed_rows,
+                        'temp_dir': os.path.join(temp_base_dir, f"temp_{server_id}_{position}"),
+                        'is_first_for_server': position == 0,
+                        'is_last_for_server': position == len(events_by_zip) - 1
+                    })
+            
+            # Read archive N+1 while archive N decodes and archive N-1 is written out
+            failures = pipeline.run_pipeline(
+                jobs,
+                [self._prepare_zip_job, decode_stage, self._output_zip_job],
+                queue_depth=self.pipeline_queue_depth
+            )
+            for job, stage, error in failures:
+                self.failed_archives.append({
+                    'server_id': job['server']['server_id'], 'zip_file': job['zip_info']['filename'],
+                    'stage': stage, 'error': error
+                })
+            
+            # Servers whose last ZIP file failed still get their reports, from the ZIP files that succeeded
+            self._output_writer.flush()
+            self._finish_output_jobs()
+            for server in servers:
+                if not server.get('finished'):
+                    self._finish_server(server)
         
         except Exception as e:
             print(f"❌ An error occurred during processing: {e}")
@@ -272,160 +503,517 @@ class MultiServerEventProcessor:
             traceback.print_exc()
         
         finally:
+            extractor.close()
+            
+            # Let outstanding writes finish (e.g. after an error) and report their events
+            self._output_writer.close()
+            self._finish_output_jobs()
+            
+            self._evict_screenshot_cache()
+            
+            for processing_manifest in self._manifests.values():
+                processing_manifest.close()
+            self._manifests = {}
+            
             # Cleanup main temp directory
             if os.path.exists(temp_base_dir):
                 shutil.rmtree(temp_base_dir)
+            self.temp_stats = dict(self.disk_budget.stats(), temp_dir=temp_base_dir)
     
-    def _process_csv_only_mode(self, events_by_server):
-        """Process events without ZIP files (CSV-only mode)."""
-        print("\n📋 Processing in CSV-only mode (no videos/screenshots)")
+    def _prepare_zip_job(self, job):
+        """Pipeline stage 1: index a ZIP file and spool the videos its events need."""
+        zip_info = job['zip_info']
+        server = job['server']
         
-        for server_id, events in events_by_server.items():
-            print(f"\n🔄 Processing server: {server_id} ({len(events)} events)")
-            
-            for event in events:
-                # Generate data for Excel without media processing
-                name = event.get('Name', '')
-                description = event.get('Description', '')
-                
-                # Track event categories
-                if description not in self.event_categories_summary:
-                    self.event_categories_summary[description] = {'count': 0, 'servers': set()}
-                self.event_categories_summary[description]['count'] += 1
-                self.event_categories_summary[description]['servers'].add(server_id)
-                
-                # Use the already parsed datetime object
-                dt = event['datetime_obj']
-                
-                # Parse End Date/Time with multiple formats
-                end_datetime_str = event.get('End Date/Time', '')
-                formatted_end_datetime = self._format_end_datetime(end_datetime_str)
-                
-                # Add to Excel data without screenshot path
-                true_event_value = event.get('True Event', '')
-                
-                excel_row = {
-                    'Server': server_id,
-                    'Name': name,
-                    'Description': description,
-                    'Date/Time': dt.strftime("%d/%m/%Y %H:%M:%S"),  # Include seconds
-                    'End Date/Time': formatted_end_datetime,
-                    'True Event': true_event_value,
-                    'Data Intervento': '',
-                    'Attività svolta': '',
-                    'Screenshot': ''  # Empty for CSV-only mode
-                }
-                
-                # Add to global data for merged report
-                self.all_excel_data.append(excel_row)
+        if job['is_first_for_server']:
+            print(f"\n🔄 Processing server: {server['server_id']}")
+        print(f"📦 Reading ZIP: {zip_info['filename']} ({len(job['events'])} events)")
+        
+        completed_count = sum(1 for row in job['completed_rows'] if row is not None)
+        if completed_count:
+            print(f"⏭️  {completed_count} events already processed in a previous run")
+        
+        job['archive'] = None
+        job['reserved_bytes'] = 0
+        job['entries'] = [
+            {'event': event, 'stored_row': row}
+            for event, row in zip(job['events'], job['completed_rows'])
+            if row is not None
+        ]
+        
+        # Nothing left to do in this archive
+        if completed_count == len(job['events']):
+            return job
+        
+        # Index the archive media without extracting it
+        with self.metrics.timer('zip_open'):
+            archive = zip_media.open_media_archive(zip_info, SUPPORTED_VIDEO_FORMATS)
+        
+        if not archive:
+            print(f"❌ Could not read media from {zip_info['filename']}")
+            return job
+        
+        os.makedirs(job['temp_dir'], exist_ok=True)
+        entries = []
+        
+        for event, stored_row in zip(job['events'], job['completed_rows']):
+            if stored_row is not None:
+                entries.append({'event': event, 'stored_row': stored_row})
+                continue
             
-            print(f"✅ Processed {len(events)} events for server {server_id}")
-    
-    def _process_events_from_zip(self, events_in_zip, media_dir, server_id, 
-                                screenshots_dir, videos_dir, event_reports_dir, excel_data):
-        """Process events from a single ZIP file."""
-        for event in events_in_zip:
             # Use the ZIP-specific media index instead of global index
-            zip_media_index = event['zip_media_index']
-            media_folder = os.path.join(media_dir, str(zip_media_index))
+            zip_media_index = event.zip_media_index
             
-            if not os.path.exists(media_folder):
+            if not archive.has_media_folder(zip_media_index):
                 print(f"❌ Media folder {zip_media_index} not found")
                 continue
             
             # Find video file
-            video_file = None
-            for file in os.listdir(media_folder):
-                if file.endswith('.mkv'):
-                    video_file = os.path.join(media_folder, file)
-                    break
+            video_member = archive.video_member(zip_media_index)
             
-            if not video_file:
+            if not video_member:
                 print(f"❌ No video found in media folder {zip_media_index}")
                 continue
             
-            # Generate filenames
-            name = event.get('Name', '')
-            description = event.get('Description', '')
-            datetime_str = event.get('Date/Time', '')
+            # Generate filenames from the datetime parsed in read_and_group_events_by_server
+            formatted_datetime = event.datetime_obj.strftime("%Y-%m-%d-%H-%M-%S")
             
-            # Track event categories
-            if description not in self.event_categories_summary:
-                self.event_categories_summary[description] = {'count': 0, 'servers': set()}
-            self.event_categories_summary[description]['count'] += 1
-            self.event_categories_summary[description]['servers'].add(server_id)
+            screenshot_names = self._screenshot_names(f"{event.name}_{event.description}_{formatted_datetime}")
+            spool_path = os.path.join(job['temp_dir'], f"{zip_media_index}.mkv")
             
-            # Use the already parsed datetime object instead of reparsing
-            dt = event['datetime_obj']  # This was already parsed in read_and_group_events_by_server
-            formatted_datetime = dt.strftime("%Y-%m-%d-%H-%M-%S")
-            
-            screenshot_name = f"{name}_{description}_{formatted_datetime}.png"
-            screenshot_path = os.path.join(screenshots_dir, screenshot_name)
-            
-            # Extract screenshot
-            print(f"📸 Extracting screenshot: {name} (ZIP media index: {zip_media_index})")
-            success = extract_screenshot(video_file, screenshot_path, self.screenshot_timestamp)
+            entries.append({
+                'event': event,
+                'stored_row': None,
+                'formatted_datetime': formatted_datetime,
+                'screenshot_names': screenshot_names,
+                'video_member': video_member,
+                'spool_path': spool_path,
+                # Workers encode into the temp folder; the output writer moves the files into place
+                'screenshot_spool_paths': [os.path.join(job['temp_dir'], screenshot_name) for screenshot_name in screenshot_names],
+                'task': None,
+                'result': None
+            })
+        
+        job['archive'] = archive
+        job['entries'] = entries
+        
+        # Wait until the videos, sized from the central directory, fit in the temp disk budget
+        job['reserved_bytes'] = sum(entry['video_member'].file_size for entry in entries if entry.get('video_member'))
+        with self.metrics.timer('disk_budget_wait'):
+            self.disk_budget.acquire(job['reserved_bytes'])
+        
+        try:
+            for entry in entries:
+                if entry.get('video_member'):
+                    self._spool_video(entry, archive)
+        except BaseException:
+            # The job is dropped from the pipeline, so its output stage will not release it
+            self.disk_budget.release(job['reserved_bytes'])
+            raise
+        
+        return job
+    
+    def _spool_video(self, entry, archive):
+        """Spool an event's video out of the archive for decoding and build its extraction task."""
+        try:
+            with self.metrics.timer('zip_extraction'):
+                archive.extract_member(entry['video_member'], entry['spool_path'])
+            self.metrics.add_bytes('videos_spooled', os.path.getsize(entry['spool_path']))
+            entry['task'] = {
+                'video_path': entry['spool_path'],
+                'timestamps': self.screenshot_timestamps,
+                'screenshot_paths': entry['screenshot_spool_paths'],
+                'seek_mode': self.seek_mode,
+                'best_frame': self.best_frame,
+                'seek_preroll_seconds': self.seek_preroll_seconds,
+                'encode_options': self.encode_options,
+                'cache_dir': self.screenshot_cache.cache_dir if self.screenshot_cache else None,
+                'video_digest': member_digest(entry['video_member'])
+            }
+        except Exception as e:
+            entry['result'] = {'success': False, 'error': f"Could not read video from ZIP: {e}"}
+    
+    def _decode_zip_job(self, job, extractor):
+        """Pipeline stage 2: extract screenshots for every spooled video of a ZIP file."""
+        runnable = [entry for entry in job['entries'] if entry.get('task') is not None]
+        
+        if runnable:
+            print(f"📸 Extracting {len(runnable)} screenshots from {job['zip_info']['filename']} with {extractor.workers} worker(s)")
+        
+        # Results arrive in task order, so reports match a serial run
+        try:
+            for entry, result in zip(runnable, extractor.map([entry['task'] for entry in runnable])):
+                entry['result'] = result
+        except Exception as e:
+            for entry in runnable:
+                if entry['result'] is None:
+                    entry['result'] = {'success': False, 'error': f"{type(e).__name__}: {e}"}
+        
+        return job
+    
+    def _output_zip_job(self, job):
+        """Pipeline stage 3: queue the media writes of a ZIP file and collect its report rows."""
+        server = job['server']
+        job['outputs'] = []
+        
+        try:
+            for entry in job['entries']:
+                self._output_event(entry, job, server)
+        finally:
+            # Free the archive, its temp folder and its disk budget once its writes are done
+            futures = [future for output in job['outputs'] for _, future in output['writes']]
+            self._output_writer.when_done(futures, lambda: self._release_zip_job(job))
+            self._pending_jobs.append(job)
+        
+        # Add the rows of the archives whose writes are done; a server's reports wait for all of them
+        if job['is_last_for_server']:
+            self._output_writer.flush()
+        self._finish_output_jobs()
+        
+        if job['is_last_for_server']:
+            self._finish_server(server)
+        
+        return job
+    
+    def _finish_server(self, server):
+        """Group a server's duplicate screenshots and write its reports, once all its ZIP files are done."""
+        server['finished'] = True
+        server_id = server['server_id']
+        excel_data = server['excel_data']
+        
+        if excel_data and self.duplicate_hash_distance is not None:
+            self._group_duplicate_screenshots(server)
+        
+        # Create individual server reports
+        if excel_data:
+            base_path = os.path.join(server['date_range'], f"{server_id}_events_report")
+            if 'xlsx' in self.report_formats:
+                excel_path = f"{base_path}.xlsx"
+                # Remove 'Server' column for individual reports
+                columns = excel_report.report_columns(excel_data, exclude=('Server',))
+                with self.metrics.timer('excel_write'):
+                    excel_report.write_events_report(excel_data, excel_path, columns)
+                self.report_paths.append(excel_path)
+                print(f"📊 Excel file created: {excel_path}")
+            self._write_event_stores(excel_data, base_path)
+        
+        # Keep the cache within its cap during long runs, not only at the end
+        self._evict_screenshot_cache()
+    
+    def _evict_screenshot_cache(self):
+        """Trim the screenshot cache to its size cap."""
+        if self.screenshot_cache:
+            evicted = self.screenshot_cache.evict()
+            if evicted:
+                print(f"🧹 Evicted {evicted} screenshots from the cache")
+    
+    def _release_zip_job(self, job):
+        """Close a ZIP file and remove its temp folder once nothing reads from them."""
+        if job['archive']:
+            job['archive'].close()
+        if os.path.exists(job['temp_dir']):
+            shutil.rmtree(job['temp_dir'])
+        self.disk_budget.release(job['reserved_bytes'])
+    
+    def _finish_output_jobs(self):
+        """Add the report rows of the queued ZIP files whose writes are done, in pipeline order."""
+        while self._pending_jobs and all(
+            future.done() for output in self._pending_jobs[0]['outputs'] for _, future in output['writes']
+        ):
+            job = self._pending_jobs.popleft()
+            server = job['server']
+            server_id = server['server_id']
             
-            if success:
-                # Copy video
-                video_name = f"{name}_{description}_{formatted_datetime}.mkv"
-                video_output_path = os.path.join(videos_dir, video_name)
-                shutil.copy2(video_file, video_output_path)
-                
-                # Copy event snapshot if it exists
-                snapshot_source = os.path.join(media_folder, "eventSnapshot.jpg")
-                if os.path.exists(snapshot_source):
-                    snapshot_name = f"{name}_{description}_{formatted_datetime}_eventSnapshot.jpg"
-                    snapshot_output_path = os.path.join(event_reports_dir, snapshot_name)
-                    shutil.copy2(snapshot_source, snapshot_output_path)
-                    print(f"📷 Copied event snapshot: {snapshot_name}")
-                else:
-                    print(f"⚠️  Event snapshot not found for: {name} (media folder {zip_media_index})")
-                
-                # Parse End Date/Time with multiple formats
-                end_datetime_str = event.get('End Date/Time', '')
-                formatted_end_datetime = self._format_end_datetime(end_datetime_str)
+            for output in job['outputs']:
+                event = output['event']
+                failures = [(label, future.exception()) for label, future in output['writes'] if future.exception()]
                 
-                # Add to Excel data with relative path
-                true_event_value = event.get('True Event', '')
+                # The event stays out of the reports and the manifest, so the next run retries it
+                if failures:
+                    self.metrics.count('events_failed')
+                    for label, error in failures:
+                        self.metrics.count('output_failed')
+                        print(f"❌ Output failed for: {event.name} ({label}) - {type(error).__name__}: {error}")
+                    continue
                 
-                # Debug: Print True Event value being added to Excel
-                if len(excel_data) < 3:  # Only for first few events
-                    print(f"DEBUG: True Event value being added to Excel: '{true_event_value}'")
-                    print(f"DEBUG: Available keys in event: {list(event.keys())}")
+                if output['stored']:
+                    self.metrics.count('events_skipped')
+                else:
+                    self.metrics.count('events_processed')
+                    screenshots = dict(zip(self._screenshot_columns(), output['row'].screenshots))
+                    server['manifest'].record_event(server_id, event, job['zip_info'], job['zip_signature'], screenshots)
                 
-                excel_row = {
-                    'Server': server_id,  # Add server column for merged report
-                    'Name': name,
-                    'Description': description,
-                    'Date/Time': dt.strftime("%d/%m/%Y %H:%M:%S"),  # Include seconds
-                    'End Date/Time': formatted_end_datetime,
-                    'True Event': true_event_value,  # Copy True Event from input CSV
-                    'Data Intervento': '',
-                    'Attività svolta': '',
-                    'Screenshot': os.path.join(server_id, "screenshots", screenshot_name).replace('\\', '/')  # Updated relative path
-                }
-                excel_data.append(excel_row)
+                # The merged report shares the row instead of copying it
+                server['excel_data'].append(output['row'])
+                self.all_excel_data.append(output['row'])
+                self.all_excel_datetimes.append(event.datetime_obj)
+            
+            # Persist progress so an interrupted run resumes after this archive
+            server['manifest'].commit()
+    
+    def _group_duplicate_screenshots(self, server):
+        """Label a server's near-duplicate screenshots per sensor, and link the duplicates if enabled."""
+        rows = server['excel_data']
+        # Events are compared on their first screenshot
+        screenshot_column = self.row_columns[len(REPORT_COLUMNS)]
+        paths = [os.path.join(server['date_range'], row[screenshot_column]) for row in rows]
+        
+        with self.metrics.timer('duplicate_detection'):
+            # Events resumed from the manifest keep the hash stored by an earlier run
+            unhashed = [position for position, row in enumerate(rows) if row.screenshot_hash is None]
+            # Reading and resizing release the GIL
+            with ThreadPoolExecutor(max_workers=self.output_workers) as executor:
+                for position, image_hash in zip(unhashed, executor.map(screenshot_dedup.dhash, [paths[position] for position in unhashed])):
+                    rows[position].screenshot_hash = image_hash
+            server['manifest'].record_screenshot_hashes(
+                server['server_id'], [(rows[position].event, rows[position].screenshot_hash) for position in unhashed]
+            )
+            self.metrics.count('screenshot_hashes_reused', len(rows) - len(unhashed))
+            hashes = [row.screenshot_hash for row in rows]
+            labels = screenshot_dedup.label_duplicate_groups([row['Name'] for row in rows], hashes, self.duplicate_hash_distance)
+        
+        for row, label in zip(rows, labels):
+            row.duplicate_group = label
+        
+        groups = len({label for label in labels if label})
+        # The first screenshot of each group is not a duplicate
+        duplicates = sum(1 for label in labels if label) - groups
+        self.duplicate_stats['screenshots'] += sum(1 for image_hash in hashes if image_hash is not None)
+        self.duplicate_stats['duplicates'] += duplicates
+        self.duplicate_stats['groups'] += groups
+        if duplicates:
+            print(f"🔁 {duplicates} near-duplicate screenshots in {groups} groups for server {server['server_id']}")
+        
+        if self.link_duplicates and duplicates:
+            with self.metrics.timer('duplicate_linking'):
+                linked, freed = screenshot_dedup.link_duplicates(paths, labels, hashes, self.duplicate_hash_distance)
+            self.duplicate_stats['linked'] += linked
+            self.duplicate_stats['bytes_freed'] += freed
+            self.metrics.add_bytes('duplicate_screenshots_freed', freed)
+    
+    def _process_csv_only_mode(self, events_by_server):
+        """Process events without ZIP files (CSV-only mode)."""
+        print("\n📋 Processing in CSV-only mode (no videos/screenshots)")
+        
+        for server_id, events in events_by_server.items():
+            print(f"\n🔄 Processing server: {server_id} ({len(events)} events)")
+            
+            for event in events:
+                # Track event categories
+                self._count_category(event.description, server_id)
                 
-                # Add to global data for merged report
-                merged_excel_row = excel_row.copy()
-                merged_excel_row['Screenshot'] = os.path.join(server_id, "screenshots", screenshot_name).replace('\\', '/')
-                self.all_excel_data.append(merged_excel_row)
+                # Add to global data for merged report; screenshot columns stay empty in CSV-only mode
+                self.all_excel_data.append(ReportRow(event, None, self.row_columns))
+                self.all_excel_datetimes.append(event.datetime_obj)
+            
+            print(f"✅ Processed {len(events)} events for server {server_id}")
     
-    def _format_end_datetime(self, end_datetime_str):
-        """Format end datetime from event data."""
-        formatted_end_datetime = '-'
+    def _output_event(self, entry, job, server):
+        """Queue the media writes of one processed event and its report row."""
+        event = entry['event']
+        server_id = server['server_id']
+        zip_media_index = event.zip_media_index
         
-        if end_datetime_str and end_datetime_str != '-':
-            for fmt in DATETIME_FORMATS:
-                try:
-                    end_dt = datetime.strptime(end_datetime_str, fmt)
-                    formatted_end_datetime = end_dt.strftime("%d/%m/%Y %H:%M:%S")  # Include seconds
-                    break
-                except ValueError:
-                    continue
+        # Track event categories
+        self._count_category(event.description, server_id)
+        
+        # Events done in a previous run only contribute their stored rows
+        if entry['stored_row'] is not None:
+            job['outputs'].append({'event': event, 'row': entry['stored_row'], 'stored': True, 'writes': []})
+            return
+        
+        archive = job['archive']
+        result = entry['result']
+        formatted_datetime = entry['formatted_datetime']
+        screenshot_names = entry['screenshot_names']
+        spool_path = entry['spool_path']
+        
+        if result.get('cache_hit') is not None:
+            self.cache_stats['hits' if result['cache_hit'] else 'misses'] += 1
+        
+        # Worker-side timings of this event
+        for step, seconds in result.get('timings', {}).items():
+            self.metrics.record(WORKER_STAGES.get(step, step), seconds)
+        if 'task_seconds' in result:
+            self.metrics.record('event_extraction', result['task_seconds'])
+        self.metrics.add_bytes('screenshots_written', result.get('bytes_written', 0))
+        
+        # Track how far the decoded frames landed from the requested timestamps
+        for timestamp, actual_timestamp in result.get('actual_timestamps', {}).items():
+            if actual_timestamp is None:
+                continue
+            seek_error = abs(actual_timestamp - timestamp)
+            self.seek_stats['frames'] += 1
+            self.seek_stats['total_error'] += seek_error
+            self.seek_stats['max_error'] = max(self.seek_stats['max_error'], seek_error)
         
-        return formatted_end_datetime
+        if result.get('actual_timestamps'):
+            self.encode_stats['screenshots'] += len(result['actual_timestamps'])
+            self.encode_stats['encode_seconds'] += result['encode_seconds']
+            self.encode_stats['bytes_written'] += result['bytes_written']
+        
+        if not result['success']:
+            self.metrics.count('events_failed')
+            print(f"❌ Screenshot failed for: {event.name} (ZIP media index: {zip_media_index}) - {result['error']}")
+            return
+        
+        writer = self._output_writer
+        writes = []
+        
+        # Move the screenshots encoded into the temp folder to the output folder
+        for screenshot_name, screenshot_spool_path in zip(screenshot_names, entry['screenshot_spool_paths']):
+            screenshot_output_path = os.path.join(server['screenshots_dir'], screenshot_name)
+            writes.append((screenshot_name, writer.submit(self._move_screenshot, screenshot_spool_path, screenshot_output_path)))
+        
+        # Export the spooled video to its destination
+        video_name = f"{event.name}_{event.description}_{formatted_datetime}.mkv"
+        video_output_path = os.path.join(server['videos_dir'], video_name)
+        writes.append((video_name, writer.submit(self._export_video, spool_path, video_output_path)))
+        
+        # Stream event snapshot if it exists
+        snapshot_member = archive.snapshot_member(zip_media_index)
+        if snapshot_member:
+            snapshot_name = f"{event.name}_{event.description}_{formatted_datetime}_eventSnapshot.jpg"
+            snapshot_output_path = os.path.join(server['event_reports_dir'], snapshot_name)
+            writes.append((snapshot_name, writer.submit(self._copy_snapshot, archive, snapshot_member, snapshot_output_path)))
+        else:
+            logger.warning(f"⚠️  Event snapshot not found for: {event.name} (media folder {zip_media_index})")
+        
+        # Debug: Print True Event value being added to Excel
+        if len(job['outputs']) < 3 and logger.isEnabledFor(logging.DEBUG):  # Only for first few events
+            logger.debug(f"True Event value being added to Excel: '{event.true_event}'")
+        
+        # One linked screenshot column per timestamp, with relative paths
+        screenshots = tuple(
+            os.path.join(server_id, "screenshots", screenshot_name).replace('\\', '/')
+            for screenshot_name in screenshot_names
+        )
+        excel_row = ReportRow(event, screenshots, self.row_columns)
+        
+        # Added to the reports once its writes succeed (see _finish_output_jobs)
+        job['outputs'].append({'event': event, 'row': excel_row, 'stored': False, 'writes': writes})
+    
+    def _move_screenshot(self, source, destination):
+        """Output writer task: move an encoded screenshot into the output folder."""
+        with self.metrics.timer('screenshot_move'):
+            shutil.move(source, destination)
+    
+    def _export_video(self, spool_path, video_output_path):
+        """Output writer task: export a spooled video."""
+        video_size = os.path.getsize(spool_path)
+        with self.metrics.timer('media_copy'):
+            self.media_exporter.export(spool_path, video_output_path)
+        self.metrics.add_bytes('videos_exported', video_size)
+    
+    def _copy_snapshot(self, archive, snapshot_member, snapshot_output_path):
+        """Output writer task: stream an event snapshot out of its ZIP file."""
+        with self.metrics.timer('snapshot_copy'):
+            archive.extract_member(snapshot_member, snapshot_output_path)
+        self.metrics.add_bytes('snapshots_copied', os.path.getsize(snapshot_output_path))
+        logger.debug(f"📷 Copied event snapshot: {os.path.basename(snapshot_output_path)}")
+    
+    def _count_category(self, description, server_id):
+        """Count an event in the category summary of its description."""
+        if description not in self.event_categories_summary:
+            self.event_categories_summary[description] = {'count': 0, 'servers': set()}
+        self.event_categories_summary[description]['count'] += 1
+        self.event_categories_summary[description]['servers'].add(server_id)
+    
+    def _screenshot_columns(self):
+        """Return the report column names of the screenshots taken per event."""
+        if len(self.screenshot_timestamps) == 1:
+            return ['Screenshot']
+        return [f"Screenshot {timestamp}s" for timestamp in self.screenshot_timestamps]
+    
+    def _screenshot_names(self, base_name):
+        """Return the screenshot filenames of an event, one per timestamp."""
+        if len(self.screenshot_timestamps) == 1:
+            return [f"{base_name}{self.screenshot_extension}"]
+        return [f"{base_name}_{timestamp}s{self.screenshot_extension}" for timestamp in self.screenshot_timestamps]
+    
+    def _completed_row(self, processing_manifest, server_id, event, zip_signature):
+        """Return the report row of an event done with the current screenshot settings, from its stored screenshots."""
+        completed = processing_manifest.completed_screenshots(server_id, event, zip_signature)
+        if completed is None:
+            return None
+        screenshots, screenshot_hash = completed
+        # Redo events whose screenshots were taken with other timestamps or in another format
+        columns = self._screenshot_columns()
+        for column in columns:
+            if not screenshots.get(column, '').endswith(self.screenshot_extension):
+                return None
+        # The other columns come from the current CSV event, so edits to it are picked up
+        return ReportRow(event, tuple(screenshots[column] for column in columns), self.row_columns, screenshot_hash)
+    
+    def _write_event_stores(self, rows, base_path):
+        """Write report rows to every configured columnar format (Parquet, SQLite)."""
+        columns = excel_report.report_columns(rows)
+        for report_format in self.report_formats:
+            if report_format == 'xlsx':
+                continue
+            with self.metrics.timer('event_store_write'):
+                output_path = event_store.write_event_store(rows, base_path, columns, report_format)
+            if output_path:
+                self.report_paths.append(output_path)
+                print(f"🗃️  Event store created: {output_path} ({len(rows)} events)")
+    
+    def _open_zip_catalog(self, directory):
+        """Open the ZIP catalog of an input directory, or return None if it is disabled or cannot be opened."""
+        if not self.zip_catalog_filename:
+            return None
+        try:
+            return ZipCatalog(directory, self.zip_catalog_filename)
+        except sqlite3.Error as e:
+            print(f"⚠️  ZIP catalog unavailable ({e}), scanning without it")
+            return None
+    
+    def _adopt_earlier_output(self, server_id, date_range, processing_manifest):
+        """
+        Move a server's output from an earlier date-range folder of the same input into date_range.
+
+        The screenshots, videos and event reports move with their manifest
+        records, so the events already done there are skipped as in any rerun.
+        """
+        if processing_manifest.has_server(server_id):
+            return
+        
+        folder_pattern = re.compile(rf"\d{{4}}-\d{{2}}-\d{{2}}_\d{{4}}-\d{{2}}-\d{{2}}_{re.escape(self.input_directory_name)}")
+        earlier_dirs = [
+            name for name in os.listdir('.')
+            if name != date_range and folder_pattern.fullmatch(name)
+            and os.path.isdir(os.path.join(name, server_id))
+            and os.path.exists(os.path.join(name, manifest.MANIFEST_FILENAME))
+        ]
+        if not earlier_dirs:
+            return
+        
+        # The most recently updated folder holds the latest output of the server
+        source_dir = max(earlier_dirs, key=lambda name: os.path.getmtime(os.path.join(name, manifest.MANIFEST_FILENAME)))
+        try:
+            os.rename(os.path.join(source_dir, server_id), os.path.join(date_range, server_id))
+        except OSError as e:
+            print(f"⚠️  Could not move the earlier output of server {server_id} from {source_dir}: {e}")
+            return
+        moved = processing_manifest.adopt_server(source_dir, server_id)
+        
+        # The server's reports there link to the moved files; new ones are written here
+        for report_path in glob.glob(os.path.join(glob.escape(source_dir), f"{glob.escape(server_id)}_events_report.*")):
+            os.remove(report_path)
+        print(f"📁 Moved the earlier output of server {server_id} ({moved} events) from {source_dir} to {date_range}")
+        
+        # Once every server has moved out, the folder's merged report and manifest are stale too
+        if not any(entry.is_dir() for entry in os.scandir(source_dir)):
+            for stale_path in glob.glob(os.path.join(glob.escape(source_dir), "complete_events_report.*")):
+                os.remove(stale_path)
+            os.remove(os.path.join(source_dir, manifest.MANIFEST_FILENAME))
+            if not os.listdir(source_dir):
+                os.rmdir(source_dir)
+    
+    def _get_manifest(self, date_range):
+        """Return the processing manifest of a date-range output directory."""
+        if date_range not in self._manifests:
+            self._manifests[date_range] = manifest.ProcessingManifest(date_range)
+        return self._manifests[date_range]
     
     def create_merged_report(self, date_range_dir, csv_only=False):
         """Create a merged Excel report with all events from all servers."""
@@ -433,23 +1021,33 @@ class MultiServerEventProcessor:
             print("⚠️  No data to merge")
             return
         
-        # Sort by date/time for better readability - updated to handle seconds
-        self.all_excel_data.sort(key=lambda x: datetime.strptime(x['Date/Time'], "%d/%m/%Y %H:%M:%S"))
+        # Sort by date/time for better readability, using the already parsed datetimes
+        order = sorted(range(len(self.all_excel_data)), key=self.all_excel_datetimes.__getitem__)
+        self.all_excel_data = [self.all_excel_data[i] for i in order]
+        self.all_excel_datetimes = [self.all_excel_datetimes[i] for i in order]
         
-        # Create merged Excel file
+        # Create merged report files
         if csv_only:
-            merged_excel_path = f"merged_events_report_csv_only_{self.input_directory_name}.xlsx"
+            merged_base_path = f"merged_events_report_csv_only_{self.input_directory_name}"
             print(f"\n📊 Creating CSV-only merged report...")
         else:
             if date_range_dir:
-                merged_excel_path = os.path.join(date_range_dir, "complete_events_report.xlsx")
+                merged_base_path = os.path.join(date_range_dir, "complete_events_report")
             else:
-                merged_excel_path = f"complete_events_report_{self.input_directory_name}.xlsx"
+                merged_base_path = f"complete_events_report_{self.input_directory_name}"
         
-        excel_report.create_excel_with_links(self.all_excel_data, merged_excel_path)
+        if 'xlsx' in self.report_formats:
+            merged_excel_path = f"{merged_base_path}.xlsx"
+            # Rows are streamed into the workbook instead of going through a DataFrame
+            columns = excel_report.report_columns(self.all_excel_data)
+            with self.metrics.timer('excel_write'):
+                row_count = excel_report.write_events_report(self.all_excel_data, merged_excel_path, columns)
+            self.report_paths.append(merged_excel_path)
+            
+            print(f"\n📊 Merged report created: {merged_excel_path}")
+            print(f"   Total events: {row_count}")
         
-        print(f"\n📊 Merged report created: {merged_excel_path}")
-        print(f"   Total events: {len(self.all_excel_data)}")
+        self._write_event_stores(self.all_excel_data, merged_base_path)
         
         if csv_only:
             print("   Note: This report contains no screenshots/videos (CSV-only mode)")
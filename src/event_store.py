@@ -0,0 +1,76 @@
+import os
+import sqlite3
+import pandas as pd
+
+# Report formats besides Excel, by file extension
+EVENT_STORE_FORMATS = ['parquet', 'sqlite']
+
+
+def _events_frame(rows, columns):
+    """Build a DataFrame of report rows plus a typed 'timestamp' column taken from each row's event."""
+    df = pd.DataFrame(rows, columns=columns)
+    df['timestamp'] = pd.to_datetime([row.event.datetime_obj for row in rows])
+    return df
+
+
+def write_parquet(rows, output_path, columns):
+    """
+    Write report rows to a Parquet file, sorted by server and timestamp.
+
+    Needs pyarrow or fastparquet; returns False with a warning when neither
+    is installed.
+    """
+    df = _events_frame(rows, columns)
+    sort_columns = [column for column in ('Server', 'timestamp') if column in df.columns]
+    df = df.sort_values(sort_columns, kind='stable')
+
+    try:
+        df.to_parquet(output_path, index=False)
+    except ImportError:
+        print(f"⚠️  Skipping Parquet export of {os.path.basename(output_path)}: install pyarrow or fastparquet")
+        return False
+    return True
+
+
+def write_sqlite(rows, output_path, columns):
+    """
+    Write report rows to an SQLite database, in an 'events' table indexed by server and timestamp.
+
+    Columns keep their report names; 'timestamp' holds the event time as
+    ISO 8601 text so it sorts and compares chronologically.
+    """
+    df = _events_frame(rows, columns)
+    df['timestamp'] = df['timestamp'].dt.strftime("%Y-%m-%d %H:%M:%S")
+    if 'Server' not in df.columns:
+        df.insert(0, 'Server', None)
+
+    # The file is a snapshot of the report, rebuilt on every run
+    if os.path.exists(output_path):
+        os.remove(output_path)
+
+    conn = sqlite3.connect(output_path)
+    try:
+        df.to_sql('events', conn, index=False)
+        conn.execute('CREATE INDEX idx_events_server_timestamp ON events ("Server", "timestamp")')
+        conn.execute('CREATE INDEX idx_events_timestamp ON events ("timestamp")')
+        conn.commit()
+    finally:
+        conn.close()
+    return True
+
+
+EVENT_STORE_WRITERS = {
+    'parquet': write_parquet,
+    'sqlite': write_sqlite,
+}
+
+
+def write_event_store(rows, base_path, columns, report_format):
+    """Write report rows to base_path plus the extension of a columnar report format."""
+    if report_format not in EVENT_STORE_WRITERS:
+        raise ValueError(f"Unknown report format: {report_format}")
+
+    output_path = f"{base_path}.{report_format}"
+    if EVENT_STORE_WRITERS[report_format](rows, output_path, columns):
+        return output_path
+    return None
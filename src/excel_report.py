@@ -1,27 +1,87 @@
-import pandas as pd
 import os
+from itertools import chain
+from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.styles import Alignment, Border, Font, Side
+
+# Header cell style of DataFrame.to_excel, kept so reports look the same
+HEADER_FONT = Font(bold=True)
+HEADER_BORDER = Border(left=Side(style='thin'), right=Side(style='thin'), top=Side(style='thin'), bottom=Side(style='thin'))
+HEADER_ALIGNMENT = Alignment(horizontal='center', vertical='top')
+
+def _header_cell(worksheet, column):
+    cell = WriteOnlyCell(worksheet, value=column)
+    cell.font = HEADER_FONT
+    cell.border = HEADER_BORDER
+    cell.alignment = HEADER_ALIGNMENT
+    return cell
+
+def _screenshot_cell(worksheet, screenshot_path, row_idx, col_idx):
+    """Build a cell showing the screenshot filename and linking to its relative path."""
+    cell = WriteOnlyCell(worksheet, value=os.path.basename(screenshot_path))
+    # The hyperlink reference is taken from the cell position
+    cell.row = row_idx
+    cell.column = col_idx
+    # Excel expects forward slashes and relative paths without leading ./
+    cell.hyperlink = screenshot_path.replace('\\', '/')
+    cell.style = "Hyperlink"
+    return cell
+
+def write_events_report(rows, output_path, columns=None):
+    """
+    Stream report rows into an Excel file with clickable links to screenshots.
+
+    Rows (dicts) are consumed one at a time and written with openpyxl's
+    write-only mode, so memory stays flat however many rows there are.
+    Every column whose name starts with 'Screenshot' links to the relative
+    path it holds and shows the filename.
+
+    Args:
+        rows (iterable): Report rows as dicts
+        output_path (str): Path of the Excel file to write
+        columns (list): Column order; defaults to the keys of the first row
+
+    Returns:
+        int: Number of rows written
+    """
+    rows = iter(rows)
+    if columns is None:
+        first_row = next(rows, None)
+        columns = list(first_row) if first_row is not None else []
+        if first_row is not None:
+            rows = chain([first_row], rows)
+
+    screenshot_columns = {column for column in columns if column.startswith('Screenshot')}
+
+    workbook = Workbook(write_only=True)
+    worksheet = workbook.create_sheet('Events')
+    worksheet.append([_header_cell(worksheet, column) for column in columns])
+
+    row_count = 0
+    for row_idx, row in enumerate(rows, start=2):
+        values = []
+        for col_idx, column in enumerate(columns, start=1):
+            value = row.get(column)
+            if value == '':
+                value = None  # Leave empty cells blank
+            elif value is not None and column in screenshot_columns:
+                value = _screenshot_cell(worksheet, value, row_idx, col_idx)
+            values.append(value)
+        worksheet.append(values)
+        row_count += 1
+
+    workbook.save(output_path)
+    return row_count
+
+def report_columns(rows, exclude=()):
+    """Return the columns of a list of rows in order of first appearance."""
+    columns = {}
+    for row in rows:
+        for column in row:
+            if column not in columns and column not in exclude:
+                columns[column] = None
+    return list(columns)
 
 def create_excel_with_links(data, output_path):
     """Create Excel file with clickable links to screenshots."""
-    df = pd.DataFrame(data)
-    
-    with pd.ExcelWriter(output_path, engine='openpyxl') as writer:
-        df.to_excel(writer, sheet_name='Events', index=False)
-        
-        workbook = writer.book
-        worksheet = writer.sheets['Events']
-        
-        # Make screenshot column clickable with relative paths
-        if 'Screenshot' in df.columns:
-            screenshot_col = df.columns.get_loc('Screenshot') + 1
-            
-            for row_idx, screenshot_path in enumerate(df['Screenshot'], start=2):
-                if screenshot_path:  # Check if path exists
-                    cell = worksheet.cell(row=row_idx, column=screenshot_col)
-                    # Create proper relative path for Excel
-                    # Excel expects forward slashes and relative paths without leading ./
-                    relative_path = screenshot_path.replace('\\', '/')
-                    cell.hyperlink = relative_path
-                    cell.style = "Hyperlink"
-                    # Set the displayed text to just the filename
-                    cell.value = os.path.basename(screenshot_path)
+    write_events_report(data, output_path, report_columns(data))
@@ -1,8 +1,10 @@
+import logging
 import os
 import re
-import zipfile
 from datetime import datetime
 
+logger = logging.getLogger(__name__)
+
 def extract_server_from_sensor_name(sensor_name):
     """Extract server ID from sensor name (first 8 characters)."""
     if len(sensor_name) >= 8:
@@ -34,25 +36,38 @@ def parse_zip_info(zip_filename):
         }
     return None
 
-def scan_directory(directory):
-    """Scan directory for ZIP files and CSV files."""
+def scan_directory(directory, exclude=None, catalog=None):
+    """
+    Scan directory for ZIP files and CSV files, skipping the filenames in exclude.
+    
+    With a ZipCatalog, unchanged archives are taken from it and the others
+    are inspected, so every zip_info also carries its media listing and
+    integrity status.
+    """
     zip_files = []
     csv_files = []
+    exclude = exclude or ()
     
     for file in os.listdir(directory):
+        if file in exclude:
+            print(f"Skipping file still being written: {file}")
+            continue
+        
         file_path = os.path.join(directory, file)
         
         if file.endswith('.zip') and 'Event_Report' in file:
-            zip_info = parse_zip_info(file)
+            zip_info = catalog.lookup(file, os.stat(file_path)) if catalog else None
+            if zip_info is None:
+                zip_info = parse_zip_info(file)
             if zip_info:
                 zip_info['filename'] = file
                 zip_info['filepath'] = file_path
                 zip_files.append(zip_info)
-                print(f"Found ZIP: {file} - Server: {zip_info['server_id']}")
+                logger.info(f"Found ZIP: {file} - Server: {zip_info['server_id']}")
         
         elif file.startswith("EventsReportFrom") and file.endswith(".csv"):
             csv_files.append(file_path)
-            print(f"Found CSV: {file}")
+            logger.info(f"Found CSV: {file}")
     
     # Group ZIP files by server
     zip_files_by_server = {}
@@ -62,42 +77,14 @@ def scan_directory(directory):
             zip_files_by_server[server_id] = []
         zip_files_by_server[server_id].append(zip_info)
     
+    if catalog:
+        catalog.update(zip_files)
+    
+    # Read CSV files in name order, so the first of several overlapping exports wins
+    csv_files.sort()
+    
     # Sort ZIP files by start time for each server
     for server_id in zip_files_by_server:
         zip_files_by_server[server_id].sort(key=lambda x: x['start_datetime'])
     
     return zip_files_by_server, csv_files
-
-def extract_and_process_zip(zip_info, temp_base_dir):
-    """Extract ZIP file and return the media directory path."""
-    zip_path = zip_info['filepath']
-    
-    # Create unique temporary directory
-    temp_dir = os.path.join(temp_base_dir, f"temp_{zip_info['server_id']}_{zip_info['start_datetime'].strftime('%Y%m%d_%H%M%S')}")
-    
-    try:
-        with zipfile.ZipFile(zip_path, 'r') as zip_ref:
-            zip_ref.extractall(temp_dir)
-    except zipfile.BadZipFile as e:
-        print(f"❌ Corrupted ZIP file: {zip_info['filename']}")
-        print(f"   Error: {e}")
-        print(f"   Please re-upload/re-download this ZIP file")
-        return None, temp_dir
-    except Exception as e:
-        print(f"❌ Error extracting ZIP file: {zip_info['filename']}")
-        print(f"   Error: {e}")
-        return None, temp_dir
-    
-    # Find the Event_Report directory
-    event_report_dir = None
-    for item in os.listdir(temp_dir):
-        item_path = os.path.join(temp_dir, item)
-        if os.path.isdir(item_path) and item.startswith("Event_Report_"):
-            event_report_dir = item_path
-            break
-    
-    if event_report_dir:
-        media_dir = os.path.join(event_report_dir, "media")
-        return media_dir, temp_dir
-    
-    return None, temp_dir
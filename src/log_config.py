@@ -0,0 +1,26 @@
+import logging
+import sys
+
+# Log records read like the rest of the console output
+LOG_FORMAT = "%(message)s"
+
+
+def configure_logging(level):
+    """
+    Send the log records of the src modules to stdout at the given level.
+
+    Verbose per-event output (saved screenshots, copied snapshots, debug
+    details) goes through these loggers, so 'WARNING' keeps production
+    runs quiet and 'DEBUG' shows everything. Safe to call more than once,
+    including in worker processes.
+    """
+    logger = logging.getLogger('src')
+    logger.setLevel(level)
+
+    if not logger.handlers:
+        handler = logging.StreamHandler(sys.stdout)
+        handler.setFormatter(logging.Formatter(LOG_FORMAT))
+        logger.addHandler(handler)
+        logger.propagate = False
+
+    return logger
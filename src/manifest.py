@@ -0,0 +1,142 @@
+import json
+import os
+import sqlite3
+
+MANIFEST_FILENAME = "processing_manifest.sqlite"
+
+
+def archive_signature(zip_info):
+    """Return the (size, mtime) pair identifying the current state of a ZIP file."""
+    stat = os.stat(zip_info['filepath'])
+    return stat.st_size, int(stat.st_mtime)
+
+
+class ProcessingManifest:
+    """
+    Record of the events already processed into a date-range output directory.
+
+    Each event is keyed by server, sensor name, description and timestamp and
+    stores the size and mtime of the ZIP file it came from, plus the paths of
+    the screenshots that were produced for it, with the difference hash of
+    the first one once duplicates have been grouped. A rerun can then skip events
+    whose archive has not changed and whose screenshots are still on disk;
+    their report rows are rebuilt from the current CSV events, so edited
+    fields such as 'True Event' show up in the reports.
+    """
+
+    def __init__(self, date_range_dir):
+        self.date_range_dir = date_range_dir
+        self.path = os.path.join(date_range_dir, MANIFEST_FILENAME)
+        os.makedirs(date_range_dir, exist_ok=True)
+
+        # Only one pipeline stage uses the manifest at a time
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute(
+            """CREATE TABLE IF NOT EXISTS events (
+                server_id TEXT NOT NULL,
+                name TEXT NOT NULL,
+                description TEXT NOT NULL,
+                timestamp TEXT NOT NULL,
+                zip_file TEXT NOT NULL,
+                zip_size INTEGER NOT NULL,
+                zip_mtime INTEGER NOT NULL,
+                screenshots TEXT NOT NULL,
+                screenshot_hash TEXT,
+                PRIMARY KEY (server_id, name, description, timestamp)
+            )"""
+        )
+        self._conn.commit()
+
+    @staticmethod
+    def _event_key(server_id, event):
+        return (
+            server_id,
+            event.name,
+            event.description,
+            event.datetime_obj.isoformat()
+        )
+
+    def completed_screenshots(self, server_id, event, zip_signature):
+        """
+        Return the stored screenshot paths of an event if it is already done.
+
+        An event counts as done when it was recorded from a ZIP file with the
+        same size and mtime and its screenshots still exist.
+
+        Returns:
+            tuple: (screenshot column -> path relative to the output
+                directory, difference hash of the first screenshot or None),
+                or None
+        """
+        record = self._conn.execute(
+            """SELECT zip_size, zip_mtime, screenshots, screenshot_hash FROM events
+               WHERE server_id = ? AND name = ? AND description = ? AND timestamp = ?""",
+            self._event_key(server_id, event)
+        ).fetchone()
+
+        if record is None or (record[0], record[1]) != tuple(zip_signature):
+            return None
+
+        screenshots = {
+            column: screenshot for column, screenshot in json.loads(record[2]).items() if column.startswith('Screenshot')
+        }
+        for screenshot in screenshots.values():
+            if screenshot and not os.path.exists(os.path.join(self.date_range_dir, screenshot)):
+                return None
+
+        return screenshots, int(record[3], 16) if record[3] else None
+
+    def record_event(self, server_id, event, zip_info, zip_signature, screenshots):
+        """Record an event as processed together with its screenshot paths (column -> path)."""
+        self._conn.execute(
+            "INSERT OR REPLACE INTO events VALUES (?, ?, ?, ?, ?, ?, ?, ?, NULL)",
+            self._event_key(server_id, event) + (
+                zip_info['filename'],
+                zip_signature[0],
+                zip_signature[1],
+                json.dumps(screenshots, ensure_ascii=False)
+            )
+        )
+
+    def record_screenshot_hashes(self, server_id, event_hashes):
+        """Store the difference hash of the first screenshot of events, as (event, hash) pairs."""
+        self._conn.executemany(
+            """UPDATE events SET screenshot_hash = ?
+               WHERE server_id = ? AND name = ? AND description = ? AND timestamp = ?""",
+            [
+                (format(image_hash, '016x') if image_hash is not None else None,) + self._event_key(server_id, event)
+                for event, image_hash in event_hashes
+            ]
+        )
+        self._conn.commit()
+
+    def has_server(self, server_id):
+        """Return True if any event of the server is recorded."""
+        return self._conn.execute("SELECT 1 FROM events WHERE server_id = ? LIMIT 1", (server_id,)).fetchone() is not None
+
+    def adopt_server(self, source_dir, server_id):
+        """
+        Move the records of a server from the manifest of another output directory into this one.
+
+        Returns:
+            int: Number of events moved
+        """
+        self._conn.commit()
+        self._conn.execute("ATTACH DATABASE ? AS source", (os.path.join(source_dir, MANIFEST_FILENAME),))
+        try:
+            moved = self._conn.execute(
+                "INSERT OR REPLACE INTO events SELECT * FROM source.events WHERE server_id = ?", (server_id,)
+            ).rowcount
+            self._conn.execute("DELETE FROM source.events WHERE server_id = ?", (server_id,))
+            self._conn.commit()
+        finally:
+            self._conn.execute("DETACH DATABASE source")
+        return moved
+
+    def commit(self):
+        """Persist recorded events, so an interrupted run resumes from here."""
+        self._conn.commit()
+
+    def close(self):
+        self._conn.commit()
+        self._conn.close()
@@ -0,0 +1,142 @@
+import os
+import shutil
+import sys
+import threading
+import uuid
+
+# Strategies in order of preference when detecting automatically
+EXPORT_STRATEGIES = ['move', 'hardlink', 'reflink', 'copy_file_range', 'copy']
+
+# Linux ioctl that clones a file's extents (btrfs, XFS with reflink=1, ...)
+FICLONE = 0x40049409
+
+
+def _export_move(source, destination):
+    os.rename(source, destination)
+
+
+def _export_hardlink(source, destination):
+    os.link(source, destination)
+
+
+def _export_reflink(source, destination):
+    import fcntl
+
+    with open(source, 'rb') as src, open(destination, 'wb') as dst:
+        try:
+            fcntl.ioctl(dst.fileno(), FICLONE, src.fileno())
+        except OSError:
+            dst.close()
+            os.remove(destination)
+            raise
+
+
+def _export_copy_file_range(source, destination):
+    with open(source, 'rb') as src, open(destination, 'wb') as dst:
+        remaining = os.fstat(src.fileno()).st_size
+        while remaining > 0:
+            copied = os.copy_file_range(src.fileno(), dst.fileno(), remaining)
+            if copied == 0:
+                break
+            remaining -= copied
+
+
+def _export_copy(source, destination):
+    shutil.copyfile(source, destination)
+
+
+EXPORT_FUNCTIONS = {
+    'move': _export_move,
+    'hardlink': _export_hardlink,
+    'reflink': _export_reflink,
+    'copy_file_range': _export_copy_file_range,
+    'copy': _export_copy,
+}
+
+
+def _strategy_supported(strategy):
+    """Return False for strategies this platform cannot offer at all."""
+    if strategy == 'reflink':
+        return sys.platform.startswith('linux')
+    if strategy == 'copy_file_range':
+        return hasattr(os, 'copy_file_range')
+    return True
+
+
+class MediaExporter:
+    """
+    Moves spooled media files into the output tree with the cheapest
+    strategy the filesystems allow.
+
+    The source file is a temp file that is discarded afterwards, so it may
+    be moved or linked rather than copied. With strategy 'auto' the best
+    working strategy is probed once per (source filesystem, output
+    directory) pair; 'copy' is always the fallback.
+    """
+
+    def __init__(self, strategy='auto'):
+        if strategy != 'auto' and strategy not in EXPORT_FUNCTIONS:
+            raise ValueError(f"Unknown media export strategy: {strategy}")
+        self.strategy = strategy
+        self.stats = {name: 0 for name in EXPORT_STRATEGIES}
+        self._detected = {}
+        self._lock = threading.Lock()
+
+    def _detect_strategy(self, source_dir, destination_dir):
+        """Probe which strategy works between two directories."""
+        probe_name = f".export_probe_{uuid.uuid4().hex}"
+        probe_source = os.path.join(source_dir, probe_name)
+        probe_destination = os.path.join(destination_dir, probe_name)
+
+        with open(probe_source, 'wb') as f:
+            f.write(b'probe')
+
+        try:
+            for strategy in EXPORT_STRATEGIES:
+                if not _strategy_supported(strategy):
+                    continue
+                try:
+                    EXPORT_FUNCTIONS[strategy](probe_source, probe_destination)
+                except OSError:
+                    continue
+                return strategy
+        finally:
+            for path in (probe_source, probe_destination):
+                if os.path.exists(path):
+                    os.remove(path)
+
+        return 'copy'
+
+    def _strategy_for(self, source, destination):
+        if self.strategy != 'auto':
+            return self.strategy
+
+        source_dir = os.path.dirname(os.path.abspath(source))
+        destination_dir = os.path.dirname(os.path.abspath(destination))
+        key = (os.stat(source_dir).st_dev, destination_dir)
+
+        with self._lock:
+            if key not in self._detected:
+                self._detected[key] = self._detect_strategy(source_dir, destination_dir)
+                print(f"📦 Media export strategy for {destination_dir}: {self._detected[key]}")
+            return self._detected[key]
+
+    def export(self, source, destination):
+        """Export a spooled file to destination, returning the strategy used."""
+        strategy = self._strategy_for(source, destination)
+
+        if os.path.exists(destination):
+            os.remove(destination)
+
+        try:
+            EXPORT_FUNCTIONS[strategy](source, destination)
+        except OSError:
+            # e.g. a configured strategy the filesystem does not support
+            if strategy == 'copy':
+                raise
+            strategy = 'copy'
+            _export_copy(source, destination)
+
+        with self._lock:
+            self.stats[strategy] += 1
+        return strategy
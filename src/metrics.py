@@ -0,0 +1,109 @@
+import csv
+import json
+import math
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+
+def percentile(sorted_values, fraction):
+    """Return the nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return None
+    rank = max(1, math.ceil(fraction * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+class RunMetrics:
+    """
+    Stage timings, counters and byte totals of one processing run.
+
+    Every duration recorded for a stage is kept as a sample, so per-event
+    stages (spooling a video, decoding it, exporting it) report p50/p95
+    latencies next to their totals. Pipeline stages run in separate
+    threads, so all updates take a lock.
+    """
+
+    def __init__(self):
+        self.started_at = time.time()
+        self._samples = {}
+        self._counters = {}
+        self._bytes = {}
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def timer(self, stage):
+        """Time the enclosed block as one sample of a stage."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(stage, time.perf_counter() - start)
+
+    def record(self, stage, seconds):
+        """Add a duration measured elsewhere (e.g. in a worker process) to a stage."""
+        with self._lock:
+            self._samples.setdefault(stage, []).append(seconds)
+
+    def count(self, name, amount=1):
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + amount
+
+    def add_bytes(self, name, amount):
+        with self._lock:
+            self._bytes[name] = self._bytes.get(name, 0) + amount
+
+    def summary(self):
+        """Return the metrics as a JSON-serializable dict."""
+        with self._lock:
+            stages = {}
+            for stage, samples in self._samples.items():
+                ordered = sorted(samples)
+                stages[stage] = {
+                    'count': len(ordered),
+                    'total_seconds': round(sum(ordered), 6),
+                    'p50_seconds': round(percentile(ordered, 0.50), 6),
+                    'p95_seconds': round(percentile(ordered, 0.95), 6),
+                    'max_seconds': round(ordered[-1], 6)
+                }
+
+            return {
+                'started_at': time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime(self.started_at)),
+                'wall_seconds': round(time.time() - self.started_at, 3),
+                'stages': stages,
+                'counters': dict(self._counters),
+                'bytes': dict(self._bytes)
+            }
+
+    def write(self, metrics_dir, run_name):
+        """
+        Write the metrics as <run_name>_<start time>.json and .csv in metrics_dir.
+
+        Returns:
+            str: Path of the JSON file
+        """
+        os.makedirs(metrics_dir, exist_ok=True)
+        summary = self.summary()
+        base_path = os.path.join(
+            metrics_dir, f"{run_name}_{time.strftime('%Y%m%d-%H%M%S', time.localtime(self.started_at))}"
+        )
+
+        with open(f"{base_path}.json", 'w', encoding='utf-8') as f:
+            json.dump(summary, f, indent=2)
+
+        # One flat row per stage, counter and byte total
+        with open(f"{base_path}.csv", 'w', encoding='utf-8', newline='') as f:
+            writer = csv.writer(f)
+            writer.writerow(['kind', 'name', 'count', 'total_seconds', 'p50_seconds', 'p95_seconds', 'max_seconds', 'value'])
+            for stage, values in summary['stages'].items():
+                writer.writerow([
+                    'stage', stage, values['count'], values['total_seconds'],
+                    values['p50_seconds'], values['p95_seconds'], values['max_seconds'], ''
+                ])
+            for name, value in summary['counters'].items():
+                writer.writerow(['counter', name, '', '', '', '', '', value])
+            for name, value in summary['bytes'].items():
+                writer.writerow(['bytes', name, '', '', '', '', '', value])
+
+        return f"{base_path}.json"
@@ -0,0 +1,76 @@
+import threading
+import traceback
+from concurrent.futures import ThreadPoolExecutor, wait
+
+
+class OutputWriter:
+    """
+    Thread pool for the writes to the output folders.
+
+    Screenshot moves, video exports and snapshot copies are submitted here
+    instead of running one after another in the pipeline's output stage,
+    so a slow output share (e.g. a network mount) is written to by several
+    threads at once and does not hold up decoding. At most max_pending
+    writes are outstanding; submit blocks beyond that, which backs the
+    pipeline up instead of piling up spooled files.
+    """
+
+    def __init__(self, workers=4, max_pending=64):
+        self.workers = workers
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="output")
+        self._slots = threading.BoundedSemaphore(max(1, max_pending))
+        self._pending = set()
+        self._lock = threading.Lock()
+
+    def submit(self, function, *args):
+        """Queue a write, blocking while max_pending writes are outstanding, and return its future."""
+        self._slots.acquire()
+        try:
+            future = self._executor.submit(function, *args)
+        except BaseException:
+            self._slots.release()
+            raise
+
+        with self._lock:
+            self._pending.add(future)
+        future.add_done_callback(self._done)
+        return future
+
+    def _done(self, future):
+        with self._lock:
+            self._pending.discard(future)
+        self._slots.release()
+
+    def when_done(self, futures, callback):
+        """Call callback (in a pool thread) once every future in futures has finished."""
+        remaining = [len(futures)]
+        lock = threading.Lock()
+
+        def run_callback():
+            try:
+                callback()
+            except Exception as e:
+                print(f"❌ Output cleanup failed: {e}")
+                traceback.print_exc()
+
+        def count_down(_):
+            with lock:
+                remaining[0] -= 1
+                finished = remaining[0] == 0
+            if finished:
+                run_callback()
+
+        if not futures:
+            run_callback()
+            return
+        for future in futures:
+            future.add_done_callback(count_down)
+
+    def flush(self):
+        """Wait until every write submitted so far has finished."""
+        with self._lock:
+            pending = list(self._pending)
+        wait(pending)
+
+    def close(self):
+        self._executor.shutdown(wait=True)
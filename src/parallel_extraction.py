@@ -0,0 +1,236 @@
+import multiprocessing
+import os
+import time
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from .log_config import configure_logging
+from .screenshot_cache import ScreenshotCache
+from .video_processing import extract_screenshots
+
+
+def _extract_event_screenshot(task, timings):
+    cache = ScreenshotCache(task['cache_dir']) if task.get('cache_dir') else None
+    captures = list(zip(task['timestamps'], task['screenshot_paths']))
+    seek_mode = task.get('seek_mode', 'legacy')
+    best_frame = task.get('best_frame')
+    cache_keys = {}
+
+    if cache:
+        start = time.perf_counter()
+        video_digest = task['video_digest']
+        # The seek mode and best-frame options decide which frame is taken, so they are part of the key
+        key_options = dict(task['encode_options'], seek_mode=seek_mode)
+        for option, value in (best_frame or {}).items():
+            key_options[f"best_frame_{option}"] = value
+        for timestamp, screenshot_path in captures:
+            cache_keys[screenshot_path] = ScreenshotCache.make_key(video_digest, timestamp, key_options)
+        captures = [
+            (timestamp, screenshot_path) for timestamp, screenshot_path in captures
+            if not cache.fetch(cache_keys[screenshot_path], screenshot_path)
+        ]
+        timings['cache_lookup'] = time.perf_counter() - start
+        if not captures:
+            return {
+                'success': True, 'error': None, 'cache_hit': True,
+                'actual_timestamps': {}, 'encode_seconds': 0.0, 'bytes_written': 0
+            }
+
+    results = extract_screenshots(
+        task['video_path'], captures,
+        seek_mode=seek_mode,
+        preroll_seconds=task.get('seek_preroll_seconds', 2.0),
+        encode_options=task['encode_options'],
+        timings=timings,
+        best_frame=best_frame
+    )
+    failed = [timestamp for (timestamp, _), result in zip(captures, results) if not result['success']]
+
+    if cache:
+        for (_, screenshot_path), result in zip(captures, results):
+            if not result['success']:
+                continue
+            try:
+                cache.store(cache_keys[screenshot_path], screenshot_path)
+            except OSError as e:
+                print(f"⚠️  Could not cache screenshot {os.path.basename(screenshot_path)}: {e}")
+
+    return {
+        'success': not failed,
+        'error': f"Screenshot extraction failed at {failed}s" if failed else None,
+        'cache_hit': False if cache else None,
+        'actual_timestamps': {
+            timestamp: result['actual_timestamp']
+            for (timestamp, _), result in zip(captures, results) if result['success']
+        },
+        'encode_seconds': sum(result['encode_seconds'] for result in results),
+        'bytes_written': sum(result['bytes'] for result in results)
+    }
+
+
+def extract_event_screenshot(task):
+    """
+    Extract the screenshots for one event from its spooled video.
+
+    All requested timestamps are taken in a single decode pass. When the
+    task names a cache directory, cached screenshots of the same video
+    content are reused and only the missing ones are decoded.
+
+    Args:
+        task (dict): Extraction task with 'video_path', 'timestamps',
+            'screenshot_paths' (one per timestamp), 'seek_mode',
+            'best_frame' (options, or None), 'encode_options',
+            'cache_dir' (or None) and 'video_digest' (the cache key of the
+            video, see screenshot_cache.member_digest)
+
+    Returns:
+        dict: Result with 'success' (bool), 'error' (str or None),
+            'cache_hit' (bool, or None when caching is disabled),
+            'actual_timestamps' (requested timestamp -> timestamp of the
+            frame decoded, for the screenshots not served from the cache),
+            'encode_seconds' and 'bytes_written' (for the decoded screenshots),
+            'timings' (seconds per step: 'cache_lookup', 'open', 'seek',
+            'decode', 'score', 'encode') and 'task_seconds'
+    """
+    start = time.perf_counter()
+    timings = {}
+    try:
+        result = _extract_event_screenshot(task, timings)
+    except Exception as e:
+        result = {
+            'success': False, 'error': f"{type(e).__name__}: {e}", 'cache_hit': None,
+            'actual_timestamps': {}, 'encode_seconds': 0.0, 'bytes_written': 0
+        }
+    result['timings'] = timings
+    result['task_seconds'] = time.perf_counter() - start
+    return result
+
+
+def resolve_worker_count(workers):
+    """Resolve the configured worker count, where None means one per CPU."""
+    if workers is None:
+        return os.cpu_count() or 1
+    return max(1, int(workers))
+
+
+class ScreenshotExtractor:
+    """
+    Fans screenshot extraction tasks out to a process pool.
+
+    Results are yielded in task order, so callers see the same sequence as a
+    serial run. With a single worker the tasks run in the calling process.
+    """
+
+    def __init__(self, workers=None, log_level='INFO'):
+        self.workers = resolve_worker_count(workers)
+        self.log_level = log_level  # Applied to the worker processes' loggers
+        self._executor = None
+
+    def _new_executor(self, workers):
+        # The pool is driven from pipeline threads, and forking a threaded
+        # process is unsafe, so workers are always spawned
+        return ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=multiprocessing.get_context('spawn'),
+            initializer=configure_logging,
+            initargs=(self.log_level,)
+        )
+
+    def _get_executor(self):
+        if self._executor is None:
+            self._executor = self._new_executor(self.workers)
+        return self._executor
+
+    def _restart_executor(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+        self._executor = None
+        return self._get_executor()
+
+    def _rerun_isolated(self, tasks):
+        """
+        Rerun tasks one at a time in a single-worker pool, after a worker crash.
+
+        A task that kills the worker fails alone and the pool is replaced for
+        the next one, so only the event that crashes a worker is reported.
+
+        Returns:
+            list: Completed futures holding each task's result, in task order
+        """
+        futures = []
+        executor = None
+        try:
+            for task in tasks:
+                if executor is None:
+                    executor = self._new_executor(1)
+                future = Future()
+                try:
+                    future.set_result(executor.submit(extract_event_screenshot, task).result())
+                except BrokenProcessPool as e:
+                    future.set_result({'success': False, 'error': f"Worker process crashed: {e}", 'cache_hit': None})
+                    executor.shutdown(wait=False)
+                    executor = None
+                futures.append(future)
+        finally:
+            if executor is not None:
+                executor.shutdown()
+        return futures
+
+    def map(self, tasks):
+        """Run extraction tasks and yield their results in task order."""
+        if self.workers <= 1:
+            for task in tasks:
+                yield extract_event_screenshot(task)
+            return
+
+        # Keep a bounded number of tasks in flight
+        max_in_flight = self.workers * 2
+        pending = deque()
+        task_iter = iter(tasks)
+        executor = self._get_executor()
+
+        def submit_next():
+            task = next(task_iter, None)
+            if task is not None:
+                pending.append((task, executor.submit(extract_event_screenshot, task)))
+
+        for _ in range(max_in_flight):
+            submit_next()
+
+        while pending:
+            task, future = pending.popleft()
+
+            try:
+                result = future.result()
+            except BrokenProcessPool:
+                # A worker died and took every unfinished task with it; any of them may
+                # be the cause, so they are rerun one at a time and only the crasher fails
+                in_flight = [(task, future)] + list(pending)
+                lost = [
+                    position for position, (_, queued_future) in enumerate(in_flight)
+                    if not queued_future.done() or queued_future.exception() is not None
+                ]
+                print(f"⚠️  A worker process crashed; rerunning {len(lost)} unfinished extraction(s) one at a time")
+                executor = self._restart_executor()
+                rerun = self._rerun_isolated([in_flight[position][0] for position in lost])
+                for position, rerun_future in zip(lost, rerun):
+                    in_flight[position] = (in_flight[position][0], rerun_future)
+                pending = deque(in_flight)
+                task, future = pending.popleft()
+                result = future.result()
+            except Exception as e:
+                result = {'success': False, 'error': f"{type(e).__name__}: {e}", 'cache_hit': None}
+
+            yield result
+            submit_next()
+
+    def close(self):
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
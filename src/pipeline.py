@@ -0,0 +1,68 @@
+import queue
+import threading
+import traceback
+
+# Marks the end of the items flowing between two stages
+_END_OF_STREAM = object()
+
+
+def _run_stage(stage, source, outbox, failures):
+    """Apply a stage to every item from source and forward results to outbox."""
+    for item in source:
+        try:
+            result = stage(item)
+        except Exception as e:
+            print(f"❌ Pipeline stage '{stage.__name__}' failed: {e}")
+            traceback.print_exc()
+            failures.append((item, stage.__name__, f"{type(e).__name__}: {e}"))
+            result = None
+
+        if outbox is not None and result is not None:
+            outbox.put(result)
+
+    if outbox is not None:
+        outbox.put(_END_OF_STREAM)
+
+
+def run_pipeline(items, stages, queue_depth=1):
+    """
+    Run items through a chain of stages, each stage in its own thread.
+
+    Stages are connected by bounded queues, so a fast stage can run at most
+    queue_depth items ahead of the next one. A stage returning None (or
+    raising) drops the item from the rest of the pipeline; items dropped by
+    an exception are returned, so the caller can finish what they belonged to.
+
+    Args:
+        items (iterable): Items fed to the first stage, in order
+        stages (list): Callables applied one after another to each item
+        queue_depth (int): Maximum items waiting between two stages
+
+    Returns:
+        list: (item, stage name, error message) for every item a stage raised on
+    """
+    queues = [queue.Queue(maxsize=max(1, queue_depth)) for _ in stages[:-1]]
+    threads = []
+    failures = []  # list.append is atomic, so the stage threads share it
+
+    for position, stage in enumerate(stages):
+        if position == 0:
+            source = iter(items)
+        else:
+            source = iter(queues[position - 1].get, _END_OF_STREAM)
+
+        outbox = queues[position] if position < len(queues) else None
+
+        thread = threading.Thread(
+            target=_run_stage,
+            args=(stage, source, outbox, failures),
+            name=f"pipeline-{stage.__name__}",
+            daemon=True
+        )
+        thread.start()
+        threads.append(thread)
+
+    for thread in threads:
+        thread.join()
+
+    return failures
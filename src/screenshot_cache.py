@@ -0,0 +1,107 @@
+import hashlib
+import os
+import shutil
+import uuid
+
+
+def member_digest(member):
+    """
+    Return a digest identifying the contents of a ZIP member.
+
+    Built from its central directory entry (path, CRC-32 and size), so it
+    costs nothing to compute, unlike hashing the extracted video.
+    """
+    identity = f"{member.filename}\0{member.CRC:08x}\0{member.file_size}"
+    return hashlib.blake2b(identity.encode(), digest_size=20).hexdigest()
+
+
+def _link_or_copy(source, destination):
+    """Hardlink source to destination, copying when links are not possible."""
+    if os.path.exists(destination):
+        os.remove(destination)
+    try:
+        os.link(source, destination)
+    except OSError:
+        shutil.copyfile(source, destination)
+
+
+class ScreenshotCache:
+    """
+    Content-addressed on-disk cache of extracted screenshots.
+
+    Entries are keyed by the digest of the video's ZIP member, the
+    screenshot timestamp and the encode options, so the same video seen
+    again (overlapping exports, re-downloaded archives, reruns) needs no
+    decode. Entry mtimes track the
+    last use and evict() removes the least recently used entries.
+    """
+
+    def __init__(self, cache_dir, max_bytes=None):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+
+    @staticmethod
+    def make_key(video_digest, timestamp, encode_options):
+        """Build the cache key for a screenshot of a video (see member_digest)."""
+        options = ",".join(f"{name}={value}" for name, value in sorted(encode_options.items()))
+        return f"{video_digest}_{timestamp}_{hashlib.blake2b(options.encode(), digest_size=8).hexdigest()}"
+
+    def _entry_path(self, key, extension):
+        return os.path.join(self.cache_dir, key[:2], f"{key}{extension}")
+
+    def fetch(self, key, output_path):
+        """Place a cached screenshot at output_path, returning True on a hit."""
+        entry_path = self._entry_path(key, os.path.splitext(output_path)[1])
+        if not os.path.exists(entry_path):
+            return False
+
+        output_dir = os.path.dirname(output_path)
+        if output_dir:
+            os.makedirs(output_dir, exist_ok=True)
+
+        try:
+            _link_or_copy(entry_path, output_path)
+            os.utime(entry_path)  # Mark as recently used
+        except OSError:
+            return False  # Evicted meanwhile, decode instead
+        return True
+
+    def store(self, key, screenshot_path):
+        """Add a freshly extracted screenshot to the cache."""
+        entry_path = self._entry_path(key, os.path.splitext(screenshot_path)[1])
+        os.makedirs(os.path.dirname(entry_path), exist_ok=True)
+
+        # Publish atomically, workers may store the same key concurrently
+        temp_path = f"{entry_path}.{uuid.uuid4().hex}.tmp"
+        _link_or_copy(screenshot_path, temp_path)
+        os.replace(temp_path, entry_path)
+
+    def evict(self):
+        """Remove least recently used entries until the cache fits max_bytes."""
+        if self.max_bytes is None or not os.path.isdir(self.cache_dir):
+            return 0
+
+        entries = []
+        for root, _, files in os.walk(self.cache_dir):
+            for file in files:
+                path = os.path.join(root, file)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, path))
+
+        total_bytes = sum(size for _, size, _ in entries)
+        removed = 0
+
+        for _, size, path in sorted(entries):
+            if total_bytes <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total_bytes -= size
+            removed += 1
+
+        return removed
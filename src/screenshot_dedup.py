@@ -0,0 +1,191 @@
+import os
+from collections import defaultdict
+
+import cv2
+import numpy as np
+
+# Bits of a difference hash (8 rows of 8 left/right comparisons)
+HASH_BITS = 64
+
+# Candidate leaders compared one by one below this count; vectorized above it
+SMALL_BUCKET = 32
+
+# Set bits of every byte value, for vectorized popcounts
+_POPCOUNT = np.array([bin(value).count('1') for value in range(256)], dtype=np.uint8)
+
+
+def dhash(image_path):
+    """
+    Return the 64-bit difference hash of an image, or None if it cannot be read.
+
+    The image is read at reduced size in grayscale and shrunk to 9x8 pixels;
+    each bit tells whether a pixel is brighter than its right neighbour, so
+    the hash survives re-encoding, small shifts in exposure and noise.
+    """
+    image = cv2.imread(image_path, cv2.IMREAD_REDUCED_GRAYSCALE_4)
+    if image is None:
+        return None
+    small = cv2.resize(image, (9, 8), interpolation=cv2.INTER_AREA)
+    bits = np.packbits(small[:, 1:] > small[:, :-1])
+    return int.from_bytes(bits.tobytes(), 'big')
+
+
+def hamming_distances(hashes, reference):
+    """Return the bit distance of every hash in a uint64 array to one reference hash."""
+    xor = np.ascontiguousarray(np.bitwise_xor(hashes, np.uint64(reference)))
+    return _POPCOUNT[xor.view(np.uint8)].reshape(len(hashes), 8).sum(axis=1)
+
+
+def _bands(max_distance):
+    """Split the hash bits into max_distance + 1 (shift, mask) bands."""
+    count = min(HASH_BITS, max_distance + 1)
+    widths = [HASH_BITS // count + (1 if band < HASH_BITS % count else 0) for band in range(count)]
+    bands = []
+    shift = 0
+    for width in widths:
+        bands.append((np.uint64(shift), np.uint64((1 << width) - 1)))
+        shift += width
+    return bands
+
+
+def group_near_duplicates(hashes, max_distance=6):
+    """
+    Group hashes within max_distance bits of the first hash of their group.
+
+    Hashes are taken in order, and each joins the group whose first hash
+    (its leader) is closest and within max_distance bits, or else leads a
+    new group; chains of small differences therefore never stretch a group
+    beyond max_distance from its leader. Leaders are indexed by
+    locality-sensitive bands: the bits are split into max_distance + 1
+    bands, so a hash within max_distance bits of a leader agrees with it
+    exactly on at least one band, and only the leaders sharing a band value
+    are compared, in one vectorized step. The work is linear in the number
+    of hashes while a sensor shows a bounded number of distinct scenes; it
+    grows quadratically when many unrelated hashes share band values (e.g.
+    mostly blank frames). Identical hashes are compared once.
+
+    Args:
+        hashes (list): 64-bit hashes as ints
+        max_distance (int): Most differing bits between near-duplicates
+
+    Returns:
+        list: Group number of each hash, numbered by first member; a hash
+            without near-duplicates has a group of its own
+    """
+    values, first_positions, inverse = np.unique(
+        np.array(hashes, dtype=np.uint64), return_index=True, return_inverse=True
+    )
+    bands = _bands(max_distance)
+    band_keys = np.stack([(values >> shift) & mask for shift, mask in bands], axis=1).tolist()
+    band_leaders = [defaultdict(list) for _ in bands]  # Band value -> leader numbers, per band
+    leader_values = np.empty(max(1, len(values)), dtype=np.uint64)
+    leader_count = 0
+    groups = np.empty(len(values), dtype=np.int64)
+    python_values = values.tolist()
+
+    for value_index in np.argsort(first_positions, kind='stable').tolist():
+        value = python_values[value_index]
+        keys = band_keys[value_index]
+        buckets = [bucket for bucket in (band_leaders[band].get(key) for band, key in enumerate(keys)) if bucket]
+        matched = sum(len(bucket) for bucket in buckets)
+
+        closest = None
+        if matched > SMALL_BUCKET:
+            # Large buckets (a busy scene) are compared in one vectorized step
+            if matched >= leader_count:
+                candidates = np.arange(leader_count)
+            else:
+                candidates = np.unique(np.concatenate(buckets))
+            distances = hamming_distances(leader_values[candidates], value)
+            best = int(np.argmin(distances))  # Ties go to the earliest leader
+            if distances[best] <= max_distance:
+                closest = int(candidates[best])
+        elif matched:
+            candidates = [leader for bucket in buckets for leader in bucket]
+            distance, leader = min((bin(value ^ int(leader_values[leader])).count('1'), leader) for leader in candidates)
+            if distance <= max_distance:
+                closest = leader
+
+        if closest is not None:
+            groups[value_index] = closest
+            continue
+
+        groups[value_index] = leader_count
+        leader_values[leader_count] = value
+        for band, key in enumerate(keys):
+            band_leaders[band][key].append(leader_count)
+        leader_count += 1
+
+    return groups[inverse.reshape(-1)].tolist()
+
+
+def label_duplicate_groups(names, hashes, max_distance=6):
+    """
+    Label the near-duplicate screenshots of each sensor.
+
+    Args:
+        names (list): Sensor name of each screenshot
+        hashes (list): dhash of each screenshot (None if unreadable)
+        max_distance (int): Most differing bits between near-duplicates
+
+    Returns:
+        list: '<name> #<n>' for screenshots with near-duplicates of the same
+            sensor, numbered per sensor in order of first appearance, else ''
+    """
+    positions_by_name = defaultdict(list)
+    for position, (name, image_hash) in enumerate(zip(names, hashes)):
+        if image_hash is not None:
+            positions_by_name[name].append(position)
+
+    labels = [''] * len(names)
+    for name, positions in positions_by_name.items():
+        groups = group_near_duplicates([hashes[position] for position in positions], max_distance)
+        sizes = defaultdict(int)
+        for group in groups:
+            sizes[group] += 1
+
+        numbers = {}
+        for position, group in zip(positions, groups):
+            if sizes[group] > 1:
+                labels[position] = f"{name} #{numbers.setdefault(group, len(numbers) + 1)}"
+    return labels
+
+
+def link_duplicates(paths, labels, hashes, max_distance=6):
+    """
+    Replace each duplicate screenshot with a hardlink to the first one of its group.
+
+    Only screenshots within max_distance bits of the group's first one are
+    linked, so no screenshot is replaced by a noticeably different image.
+    Screenshots already linked (e.g. by a previous run) are left alone, and
+    linking stops quietly where the filesystem has no hardlinks.
+
+    Returns:
+        tuple: (screenshots linked, bytes freed)
+    """
+    firsts = {}  # Label -> (path, hash) of the group's first screenshot
+    linked = 0
+    freed = 0
+
+    for path, label, image_hash in zip(paths, labels, hashes):
+        if not label:
+            continue
+        first_path, first_hash = firsts.setdefault(label, (path, image_hash))
+        if path == first_path or bin(image_hash ^ first_hash).count('1') > max_distance:
+            continue
+        if os.path.samefile(path, first_path):
+            continue
+
+        size = os.path.getsize(path)
+        link_path = f"{path}.link"
+        if os.path.exists(link_path):
+            os.remove(link_path)  # Left by an interrupted run
+        try:
+            os.link(first_path, link_path)
+        except OSError:
+            return linked, freed
+        os.replace(link_path, path)
+        linked += 1
+        freed += size
+
+    return linked, freed
@@ -34,3 +34,62 @@ def display_final_summary(event_categories_summary):
         print()
     
     print("="*60)
+
+def display_cache_summary(cache_stats):
+    """Display screenshot cache hit and miss counts."""
+    lookups = cache_stats['hits'] + cache_stats['misses']
+    hit_rate = (cache_stats['hits'] / lookups) * 100 if lookups > 0 else 0
+    
+    print(f"\n🗄️  Screenshot cache: {cache_stats['hits']} hits, {cache_stats['misses']} misses ({hit_rate:.1f}% hit rate)")
+
+def display_seek_summary(seek_mode, seek_stats):
+    """Display how far decoded frames landed from the requested timestamps."""
+    if not seek_stats['frames']:
+        return
+    
+    mean_error = seek_stats['total_error'] / seek_stats['frames']
+    print(f"🎯 Seek accuracy ({seek_mode}): {seek_stats['frames']} frames, "
+          f"mean error {mean_error * 1000:.1f} ms, max {seek_stats['max_error'] * 1000:.1f} ms")
+
+def display_encode_summary(encode_options, encode_stats):
+    """Display screenshot encode time and bytes written, to compare encode settings."""
+    if not encode_stats['screenshots']:
+        return
+    
+    settings = ", ".join(f"{option}={value}" for option, value in encode_options.items())
+    count = encode_stats['screenshots']
+    print(f"🖼️  Screenshots encoded ({settings}): {count} in {encode_stats['encode_seconds']:.2f}s "
+          f"({encode_stats['encode_seconds'] / count * 1000:.1f} ms each), "
+          f"{encode_stats['bytes_written'] / 1024 ** 2:.2f} MiB written "
+          f"({encode_stats['bytes_written'] / count / 1024:.1f} KiB each)")
+
+def display_duplicate_summary(duplicate_stats):
+    """Display how many screenshots are near-duplicates of another of the same sensor."""
+    if not duplicate_stats['screenshots']:
+        return
+    
+    line = (f"🔁 Near-duplicate screenshots: {duplicate_stats['duplicates']} of {duplicate_stats['screenshots']} "
+            f"in {duplicate_stats['groups']} groups")
+    if duplicate_stats['linked']:
+        line += f", {duplicate_stats['linked']} linked ({duplicate_stats['bytes_freed'] / 1024 ** 2:.2f} MiB freed)"
+    print(line)
+
+def display_export_summary(export_stats):
+    """Display how spooled videos were exported to the output folders."""
+    used = {strategy: count for strategy, count in export_stats.items() if count}
+    if not used:
+        return
+    
+    breakdown = ", ".join(f"{count} via {strategy}" for strategy, count in used.items())
+    print(f"📦 Videos exported: {breakdown}")
+
+def display_temp_disk_summary(temp_stats):
+    """Display the peak disk use of the spooled videos against the temp budget."""
+    peak_mib = temp_stats['peak_bytes'] / 1024 ** 2
+    if temp_stats['budget_bytes'] is None:
+        print(f"💽 Temp disk: peak {peak_mib:.1f} MiB in {temp_stats['temp_dir']} (no budget)")
+        return
+    
+    budget_mib = temp_stats['budget_bytes'] / 1024 ** 2
+    print(f"💽 Temp disk: peak {peak_mib:.1f} MiB of {budget_mib:.1f} MiB budget in {temp_stats['temp_dir']}, "
+          f"{temp_stats['waits']} archive(s) waited for space")
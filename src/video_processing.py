@@ -1,69 +1,447 @@
 import cv2
+import logging
+import math
+import numpy as np
 import os
+import time
 
-def extract_screenshot(video_path, output_path, timestamp_seconds=13):
+logger = logging.getLogger(__name__)
+
+# Screenshot file extension per encode format
+SCREENSHOT_EXTENSIONS = {'png': '.png', 'jpg': '.jpg', 'webp': '.webp'}
+
+def screenshot_extension(encode_options):
+    """Return the file extension of screenshots written with the given encode options."""
+    image_format = (encode_options or {}).get('format', 'png')
+    if image_format not in SCREENSHOT_EXTENSIONS:
+        raise ValueError(f"Unknown screenshot format: {image_format}")
+    return SCREENSHOT_EXTENSIONS[image_format]
+
+def _imwrite_params(encode_options):
+    """Translate encode options into cv2.imwrite parameters."""
+    image_format = encode_options.get('format', 'png')
+    params = []
+
+    if image_format == 'png' and encode_options.get('png_compression') is not None:
+        params += [cv2.IMWRITE_PNG_COMPRESSION, int(encode_options['png_compression'])]
+    elif image_format == 'jpg' and encode_options.get('quality') is not None:
+        params += [cv2.IMWRITE_JPEG_QUALITY, int(encode_options['quality'])]
+    elif image_format == 'webp' and encode_options.get('quality') is not None:
+        params += [cv2.IMWRITE_WEBP_QUALITY, int(encode_options['quality'])]
+
+    return params
+
+def _resize_frame(frame, max_dimension):
+    """Downscale a frame so its longest side is at most max_dimension pixels."""
+    height, width = frame.shape[:2]
+    longest = max(height, width)
+    if not max_dimension or longest <= max_dimension:
+        return frame
+
+    scale = max_dimension / longest
+    size = (max(1, round(width * scale)), max(1, round(height * scale)))
+    return cv2.resize(frame, size, interpolation=cv2.INTER_AREA)
+
+def _save_frame(frame, output_path, encode_options=None):
     """
-    Extract a screenshot from a video at a specific timestamp.
-    
+    Save a frame as an image, creating the output directory if needed.
+
+    The image format follows the extension of output_path; encode_options
+    may set 'png_compression', 'quality' (JPEG/WebP) and 'max_dimension'.
+
+    Returns:
+        dict: 'success' (bool), 'encode_seconds' (float) and 'bytes' (int written)
+    """
+    encode_options = encode_options or {}
+    output_dir = os.path.dirname(output_path)
+    if output_dir and not os.path.exists(output_dir):
+        os.makedirs(output_dir, exist_ok=True)
+
+    start = time.perf_counter()
+    frame = _resize_frame(frame, encode_options.get('max_dimension'))
+    success, buffer = cv2.imencode(os.path.splitext(output_path)[1], frame, _imwrite_params(encode_options))
+    encode_seconds = time.perf_counter() - start
+
+    bytes_written = 0
+    if success:
+        try:
+            with open(output_path, 'wb') as f:
+                f.write(buffer.tobytes())
+            bytes_written = len(buffer)
+        except OSError:
+            success = False
+
+    if success:
+        logger.debug(f"Screenshot saved: {os.path.basename(output_path)}")
+    else:
+        logger.error(f"Error: Could not save screenshot to: {output_path}")
+
+    return {'success': success, 'encode_seconds': encode_seconds, 'bytes': bytes_written}
+
+def _position_seconds(cap):
+    """Return the timestamp of the frame last read from the capture."""
+    return cap.get(cv2.CAP_PROP_POS_MSEC) / 1000
+
+def _timed(timings, stage, function, *args):
+    """Call function, adding its duration to timings[stage]."""
+    start = time.perf_counter()
+    try:
+        return function(*args)
+    finally:
+        timings[stage] = timings.get(stage, 0.0) + time.perf_counter() - start
+
+def _read_frame_at(cap, position_seconds, frame_duration, preroll_seconds, timings):
+    """Seek back before a frame read earlier and decode forward to it, or return None."""
+    _timed(timings, 'seek', cap.set, cv2.CAP_PROP_POS_MSEC, max(0, position_seconds - preroll_seconds) * 1000)
+    while True:
+        if not _timed(timings, 'decode', cap.grab):
+            return None
+        # Half a frame of tolerance for rounding in the reported position
+        if _position_seconds(cap) >= position_seconds - frame_duration / 2:
+            break
+    ret, frame = _timed(timings, 'decode', cap.retrieve)
+    return frame if ret else None
+
+def _last_frame_position(cap, start_seconds, timings):
+    """
+    Decode from start_seconds to the end of the video and return the timestamp of its last frame.
+
+    The frame count, and so the duration, of some containers (e.g. MKV) is
+    only an estimate; when start_seconds turns out to be past the end, the
+    video is decoded again from the start. Returns None for a video without
+    readable frames.
+    """
+    for seek_seconds in ([start_seconds, 0] if start_seconds > 0 else [0]):
+        _timed(timings, 'seek', cap.set, cv2.CAP_PROP_POS_MSEC, seek_seconds * 1000)
+        position = None
+        while _timed(timings, 'decode', cap.grab):
+            position = _position_seconds(cap)
+        if position is not None:
+            return position
+    return None
+
+def _read_last_frame(cap, duration_hint, frame_duration, preroll_seconds, timings):
+    """Return the last frame of the video and its timestamp, or (None, None)."""
+    position = _last_frame_position(cap, max(0, duration_hint - preroll_seconds), timings)
+    if position is None:
+        return None, None
+    return _read_frame_at(cap, position, frame_duration, preroll_seconds, timings), position
+
+def _read_frames_legacy(cap, targets, fps, timings):
+    """Frame-number seek computed from FPS, then decode forward to later frames."""
+    frame_numbers = [int(timestamp_seconds * fps) for timestamp_seconds, _ in targets]
+    total_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+    if total_frames > 0:
+        frame_numbers = [min(frame_number, total_frames - 1) for frame_number in frame_numbers]
+
+    # Seek once to the earliest frame, then decode forward
+    _timed(timings, 'seek', cap.set, cv2.CAP_PROP_POS_FRAMES, frame_numbers[0])
+    current_frame = frame_numbers[0]
+    frame = None
+    actual_timestamp = None
+    frame_number_read = None
+
+    for frame_number in frame_numbers:
+        # Several timestamps may map to the same frame
+        if frame_number != frame_number_read:
+            while current_frame < frame_number:
+                if not _timed(timings, 'decode', cap.grab):
+                    break
+                current_frame += 1
+
+            ret, frame = _timed(timings, 'decode', cap.read)
+            if not ret:
+                return
+            frame_number_read = current_frame
+            actual_timestamp = _position_seconds(cap)
+            current_frame += 1
+
+        yield frame, actual_timestamp
+
+def _read_frames_exact(cap, targets, fps, preroll_seconds, duration_hint, timings):
+    """
+    Time-based seek before the earliest target, then decode forward to each one.
+
+    Targets past the end of the video get its last frame, with that frame's
+    own timestamp; duration_hint (an estimate) only speeds up finding it.
+    """
+    frame_duration = 1 / fps if fps > 0 else 0
+
+    _timed(timings, 'seek', cap.set, cv2.CAP_PROP_POS_MSEC, max(0, targets[0][0] - preroll_seconds) * 1000)
+    frame = None
+    position = None
+    at_end = False
+
+    for timestamp_seconds, _ in targets:
+        # Take the frame on screen at the target time: the last one starting at or before it
+        while not at_end and (position is None or position + frame_duration <= timestamp_seconds):
+            if not _timed(timings, 'decode', cap.grab):
+                # The video ends before the target: its last frame stays on screen.
+                # A failed grab discards that frame, so seek back and decode it again
+                at_end = True
+                if position is None:
+                    # The seek itself landed past the end
+                    frame, position = _read_last_frame(cap, duration_hint, frame_duration, preroll_seconds, timings)
+                elif frame is None:
+                    frame = _read_frame_at(cap, position, frame_duration, preroll_seconds, timings)
+                if frame is None:
+                    return
+                break
+            position = _position_seconds(cap)
+            frame = None
+
+        if frame is None:
+            ret, frame = _timed(timings, 'decode', cap.retrieve)
+            if not ret:
+                return
+
+        yield frame, position
+
+def _read_frames_fast(cap, targets, fps, preroll_seconds, duration_hint, timings):
+    """
+    Time-based seek straight to each target, keeping whatever frame the backend lands on.
+
+    A seek past the end of the video fails; that target and the later ones
+    get the last frame, as in 'exact'.
+    """
+    for position, (timestamp_seconds, _) in enumerate(targets):
+        _timed(timings, 'seek', cap.set, cv2.CAP_PROP_POS_MSEC, timestamp_seconds * 1000)
+        ret, frame = _timed(timings, 'decode', cap.read)
+        if not ret:
+            break
+        yield frame, _position_seconds(cap)
+    else:
+        return
+
+    # Targets are sorted, so the rest are past the end too
+    frame_duration = 1 / fps if fps > 0 else 0
+    frame, last_position = _read_last_frame(cap, duration_hint, frame_duration, preroll_seconds, timings)
+    if frame is None:
+        return
+    for _ in targets[position:]:
+        yield frame, last_position
+
+def _score_thumbnail(frame, score_width):
+    """Downscale a frame to a grayscale float32 thumbnail score_width pixels wide for scoring."""
+    gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY) if frame.ndim == 3 else frame
+    height, width = gray.shape
+    if width > score_width:
+        gray = cv2.resize(gray, (score_width, max(3, round(height * score_width / width))), interpolation=cv2.INTER_AREA)
+    return gray.astype(np.float32)
+
+def _normalize_scores(values):
+    """Scale non-negative scores to 0-1 by the largest one."""
+    peak = values.max()
+    return values / peak if peak > 0 else values
+
+def score_frames(thumbnails, motion_weight=0.5):
+    """
+    Score a batch of grayscale thumbnails on sharpness and motion.
+
+    Sharpness is the variance of each frame's 4-neighbour Laplacian; motion
+    is the mean absolute difference to the neighbouring candidates. Both are
+    computed for the whole batch at once and scaled to 0-1 across it, so a
+    blurred or empty frame scores low on both.
+
+    Args:
+        thumbnails (numpy.ndarray): (frames, height, width) float32 array
+        motion_weight (float): Weight of motion relative to sharpness
+
+    Returns:
+        numpy.ndarray: One score per frame, higher is better
+    """
+    laplacian = (
+        thumbnails[:, :-2, 1:-1] + thumbnails[:, 2:, 1:-1] + thumbnails[:, 1:-1, :-2] + thumbnails[:, 1:-1, 2:]
+        - 4 * thumbnails[:, 1:-1, 1:-1]
+    )
+    sharpness = laplacian.var(axis=(1, 2))
+
+    if len(thumbnails) > 1:
+        differences = np.abs(np.diff(thumbnails, axis=0)).mean(axis=(1, 2))
+        # Average each frame's differences to the candidates before and after it
+        padded = np.concatenate((differences[:1], differences, differences[-1:]))
+        motion = (padded[:-1] + padded[1:]) / 2
+    else:
+        motion = np.zeros(1, dtype=np.float32)
+
+    return _normalize_scores(sharpness) + motion_weight * _normalize_scores(motion)
+
+def _read_frames_best(cap, targets, fps, preroll_seconds, duration_hint, best_frame, timings):
+    """
+    Decode a window around each target and keep its best-scoring frame.
+
+    Seeks by time preroll_seconds before the window, like 'exact', then
+    decodes the window and retrieves every stride-th frame as a candidate,
+    keeping only its position and a small grayscale thumbnail. The
+    thumbnails are scored in one batch, and the winner is decoded again at
+    full resolution by seeking back to its position.
+    """
+    frame_duration = 1 / fps if fps > 0 else 0
+    window_seconds = best_frame['window_seconds']
+    max_frames = best_frame['max_frames']
+    if fps > 0:
+        # Cost cap: shrink the window to max_frames decoded frames, and sample at most 'candidates' of them
+        window_seconds = min(window_seconds, max_frames / fps / 2)
+        stride = max(1, math.ceil(2 * window_seconds * fps / best_frame['candidates']))
+    else:
+        stride = max(1, math.ceil(max_frames / best_frame['candidates']))
+
+    for timestamp_seconds, _ in targets:
+        start_seconds = max(0, timestamp_seconds - window_seconds)
+        end_seconds = timestamp_seconds + window_seconds
+        _timed(timings, 'seek', cap.set, cv2.CAP_PROP_POS_MSEC, max(0, start_seconds - preroll_seconds) * 1000)
+
+        positions, thumbnails = [], []
+        frame = None
+        decoded = 0
+        while decoded < max_frames:
+            if not _timed(timings, 'decode', cap.grab):
+                break
+            position = _position_seconds(cap)
+            if position + frame_duration <= start_seconds:
+                continue  # Still in the preroll
+            if position > end_seconds:
+                break
+
+            if decoded % stride == 0:
+                ret, retrieved = _timed(timings, 'decode', cap.retrieve)
+                if ret:
+                    frame = retrieved
+                    positions.append(position)
+                    thumbnails.append(_timed(timings, 'score', _score_thumbnail, frame, best_frame['score_width']))
+            decoded += 1
+
+        if not positions:
+            # The window starts past the end of the video: its last frame is all there is
+            frame, last_position = _read_last_frame(cap, duration_hint, frame_duration, preroll_seconds, timings)
+            if frame is None:
+                return
+            yield frame, last_position
+            continue
+
+        scores = _timed(timings, 'score', score_frames, np.stack(thumbnails), best_frame['motion_weight'])
+        best = int(np.argmax(scores))
+        if best != len(positions) - 1:
+            # Only the last candidate is still in memory; decode the winner again
+            frame = _read_frame_at(cap, positions[best], frame_duration, preroll_seconds, timings)
+            if frame is None:
+                return
+        logger.debug(f"Best frame at {positions[best]:.2f}s of {len(positions)} candidates around {timestamp_seconds}s")
+        yield frame, positions[best]
+
+def extract_screenshots(video_path, captures, seek_mode='legacy', preroll_seconds=2.0, encode_options=None,
+                        timings=None, best_frame=None):
+    """
+    Extract several screenshots from a video in a single decode pass.
+
+    The video is opened once and seeked to the earliest requested frame;
+    later frames are reached by decoding forward instead of re-seeking.
+
+    Seek modes:
+        legacy: frame-number seek computed from FPS (the original behavior)
+        exact: time-based seek preroll_seconds before the target, then
+            decode forward to the frame on screen at the target time
+        fast: time-based seek to each target, no forward decoding
+
+    With best_frame set, each screenshot is instead the best-scoring frame
+    (see score_frames) within best_frame['window_seconds'] either side of
+    its timestamp, decoding at most best_frame['max_frames'] frames of the
+    window and scoring at most best_frame['candidates'] of them, each
+    downscaled to best_frame['score_width'] pixels wide. Only the chosen
+    frame is encoded, at full resolution.
+
     Args:
         video_path (str): Path to the input video file
-        output_path (str): Path where the screenshot will be saved
-        timestamp_seconds (int): Timestamp in seconds to extract the frame
-    
+        captures (list): (timestamp_seconds, output_path) pairs
+        seek_mode (str): 'legacy', 'exact' or 'fast'
+        preroll_seconds (float): How far before the target 'exact' seeks
+        encode_options (dict): Image encode options (see _save_frame)
+        timings (dict): If given, seconds spent per step are added to its
+            'open', 'seek', 'decode', 'score' and 'encode' keys
+        best_frame (dict): Best-frame selection options, or None to save the
+            frame at each timestamp
+
     Returns:
-        bool: True if successful, False otherwise
+        list: One dict per capture, in the order given, with 'success'
+            (bool), 'actual_timestamp' (seconds of the frame saved, or None),
+            'encode_seconds' and 'bytes' (see _save_frame)
     """
-    
+    results = [
+        {'success': False, 'actual_timestamp': None, 'encode_seconds': 0.0, 'bytes': 0}
+        for _ in captures
+    ]
+    timings = {} if timings is None else timings
+    if not captures:
+        return results
+
     # Check if video file exists
     if not os.path.exists(video_path):
-        print(f"Error: Video file not found: {video_path}")
-        return False
-    
+        logger.error(f"Error: Video file not found: {video_path}")
+        return results
+
     # Open the video file
-    cap = cv2.VideoCapture(video_path)
-    
+    cap = _timed(timings, 'open', cv2.VideoCapture, video_path)
+
     if not cap.isOpened():
-        print(f"Error: Could not open video file: {video_path}")
-        return False
-    
+        logger.error(f"Error: Could not open video file: {video_path}")
+        return results
+
     # Get video properties
     fps = cap.get(cv2.CAP_PROP_FPS)
     total_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
     duration = total_frames / fps if fps > 0 else 0
-    
-    # Check if timestamp is within video duration
-    if timestamp_seconds > duration:
-        print(f"Warning: Timestamp {timestamp_seconds}s exceeds video duration {duration:.2f}s, using last frame")
-        timestamp_seconds = max(0, duration - 1)
-    
-    # Calculate frame number for the timestamp
-    frame_number = int(timestamp_seconds * fps)
-    
-    # Set video position to the desired frame
-    cap.set(cv2.CAP_PROP_POS_FRAMES, frame_number)
-    
-    # Read the frame
-    ret, frame = cap.read()
-    
-    if not ret:
-        print(f"Error: Could not read frame at timestamp {timestamp_seconds}s")
+
+    # Legacy seeks by frame number, so it clamps each timestamp to the duration estimated from
+    # the frame count; the time-based modes take the last frame of videos that end earlier
+    targets = []
+    for position, (timestamp_seconds, output_path) in enumerate(captures):
+        # Check if timestamp is within video duration
+        if seek_mode == 'legacy' and not best_frame and timestamp_seconds > duration:
+            logger.warning(f"Warning: Timestamp {timestamp_seconds}s exceeds video duration {duration:.2f}s, using last frame")
+            timestamp_seconds = max(0, duration - 1)
+        targets.append((timestamp_seconds, position, output_path))
+
+    targets.sort()
+    requested = [(timestamp_seconds, output_path) for timestamp_seconds, _, output_path in targets]
+
+    if seek_mode not in ('legacy', 'exact', 'fast'):
         cap.release()
-        return False
-    
-    # Create output directory if it doesn't exist
-    output_dir = os.path.dirname(output_path)
-    if output_dir and not os.path.exists(output_dir):
-        os.makedirs(output_dir)
-    
-    # Save the frame as an image
-    success = cv2.imwrite(output_path, frame)
-    
-    if success:
-        print(f"Screenshot saved: {os.path.basename(output_path)}")
+        raise ValueError(f"Unknown seek mode: {seek_mode}")
+
+    if best_frame:
+        frames = _read_frames_best(cap, requested, fps, preroll_seconds, duration, best_frame, timings)
+    elif seek_mode == 'exact':
+        frames = _read_frames_exact(cap, requested, fps, preroll_seconds, duration, timings)
+    elif seek_mode == 'fast':
+        frames = _read_frames_fast(cap, requested, fps, preroll_seconds, duration, timings)
     else:
-        print(f"Error: Could not save screenshot to: {output_path}")
-    
+        frames = _read_frames_legacy(cap, requested, fps, timings)
+
+    read_count = 0
+    for (timestamp_seconds, position, output_path), (frame, actual_timestamp) in zip(targets, frames):
+        # Save the frame as an image
+        results[position] = dict(_save_frame(frame, output_path, encode_options), actual_timestamp=actual_timestamp)
+        timings['encode'] = timings.get('encode', 0.0) + results[position]['encode_seconds']
+        read_count += 1
+
+    if read_count < len(targets):
+        logger.error(f"Error: Could not read frame at timestamp {targets[read_count][0]}s")
+
     # Release the video capture object
     cap.release()
-    
-    return success
+
+    return results
+
+def extract_screenshot(video_path, output_path, timestamp_seconds=13):
+    """
+    Extract a screenshot from a video at a specific timestamp.
+
+    Args:
+        video_path (str): Path to the input video file
+        output_path (str): Path where the screenshot will be saved
+        timestamp_seconds (int): Timestamp in seconds to extract the frame
+
+    Returns:
+        bool: True if successful, False otherwise
+    """
+    return extract_screenshots(video_path, [(timestamp_seconds, output_path)])[0]['success']
@@ -0,0 +1,133 @@
+import os
+import time
+from config import WATCH_POLL_SECONDS, WATCH_SETTLE_SECONDS
+
+
+def _is_input_file(filename):
+    """Return True for the event CSV and ZIP files scan_directory picks up."""
+    return (
+        (filename.endswith('.zip') and 'Event_Report' in filename) or
+        (filename.startswith("EventsReportFrom") and filename.endswith(".csv"))
+    )
+
+
+def _input_file_signatures(directory):
+    """Return the (size, mtime) of every input file in a directory, by filename."""
+    signatures = {}
+    for filename in os.listdir(directory):
+        if not _is_input_file(filename):
+            continue
+        try:
+            stat = os.stat(os.path.join(directory, filename))
+        except OSError:
+            continue  # Removed or renamed since listing
+        signatures[filename] = (stat.st_size, stat.st_mtime_ns)
+    return signatures
+
+
+class FolderWatcher:
+    """
+    Polls an input directory and processes it again when new files have landed.
+
+    A file counts as landed once its size and mtime have not changed for
+    settle_seconds, so archives still being copied are left out of the run.
+    Each run goes through the processor's manifest, so only events that are
+    not yet done are extracted and screenshots hashed; the reports are then
+    rewritten from the stored rows of earlier runs plus the new ones. Files
+    of a failed run are retried on the next poll.
+    """
+
+    def __init__(self, directory, processor, settle_seconds=WATCH_SETTLE_SECONDS):
+        self.directory = directory
+        self.processor = processor
+        self.settle_seconds = settle_seconds
+        self._observed = {}  # filename -> (signature, monotonic time it was first seen)
+        self._processed = {}  # filename -> signature included in the last run
+
+    def poll(self):
+        """
+        Look at the directory once.
+
+        Returns:
+            tuple: (landed, pending) filenames, where landed files are stable
+                and new or changed since the last run, and pending files are
+                still changing
+        """
+        now = time.monotonic()
+        signatures = _input_file_signatures(self.directory)
+
+        for filename in list(self._observed):
+            if filename not in signatures:
+                del self._observed[filename]
+                self._processed.pop(filename, None)
+
+        landed = []
+        pending = []
+        for filename, signature in signatures.items():
+            if filename not in self._observed or self._observed[filename][0] != signature:
+                self._observed[filename] = (signature, now)
+
+            if now - self._observed[filename][1] < self.settle_seconds:
+                pending.append(filename)
+            elif self._processed.get(filename) != signature:
+                landed.append(filename)
+
+        return sorted(landed), sorted(pending)
+
+    def run_once(self):
+        """Process the directory if files have landed, returning the run result or None."""
+        landed, pending = self.poll()
+        if not landed:
+            return None
+
+        print(f"\n👀 {len(landed)} new file(s) in {self.directory}: {', '.join(landed)}")
+        self.processor.exclude_files = set(pending)
+        try:
+            success = self.processor.process_multiple_servers(self.directory)
+        finally:
+            self.processor.exclude_files = set()
+
+        # Files of a failed run are retried on the next poll: only the ZIP files the
+        # run failed on, or every file when it failed before reaching them
+        failed_files = {failure['zip_file'] for failure in self.processor.failed_archives}
+        if not success and not failed_files:
+            return success
+
+        for filename, (signature, _) in self._observed.items():
+            if filename not in pending and filename not in failed_files:
+                self._processed[filename] = signature
+
+        return success
+
+
+def watch(watchers, poll_interval=WATCH_POLL_SECONDS, on_run=None, max_polls=None):
+    """
+    Poll several watched directories until interrupted.
+
+    Args:
+        watchers (list): FolderWatcher instances
+        poll_interval (float): Seconds between polls
+        on_run (callable): Called with (watcher, success, elapsed_seconds)
+            after each processing run
+        max_polls (int): Stop after this many polls (None = run forever)
+    """
+    polls = 0
+    print(f"👀 Watching {', '.join(watcher.directory for watcher in watchers)} (Ctrl+C to stop)")
+
+    try:
+        while max_polls is None or polls < max_polls:
+            for watcher in watchers:
+                start = time.perf_counter()
+                try:
+                    success = watcher.run_once()
+                except Exception as e:
+                    # Keep watching the other directories
+                    print(f"❌ Processing failed for {watcher.directory}: {type(e).__name__}: {e}")
+                    success = False
+                if success is not None and on_run:
+                    on_run(watcher, success, time.perf_counter() - start)
+            polls += 1
+            if max_polls is None or polls < max_polls:
+                time.sleep(poll_interval)
+    except KeyboardInterrupt:
+        print("\n⏹️  Watch stopped.")
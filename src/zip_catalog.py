@@ -0,0 +1,162 @@
+import json
+import os
+import sqlite3
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from .zip_media import MEDIA_MEMBER_PATTERN, ZipMediaArchive
+from config import SUPPORTED_VIDEO_FORMATS, ZIP_CATALOG_FILENAME, ZIP_CATALOG_VERIFY_CRC, ZIP_CATALOG_WORKERS
+
+
+def inspect_archive(zip_path, video_formats=('.mkv',), verify_crc=False):
+    """
+    List the media of a ZIP file and check its integrity.
+
+    Returns:
+        dict: 'status' ('ok' or 'corrupt'), 'error' (None or a message) and
+            'media' ({media index: {'video_size', 'snapshot', 'corrupt'}}),
+            empty when the central directory cannot be read
+    """
+    try:
+        with ZipMediaArchive(zip_path, video_formats) as archive:
+            media = {
+                media_index: {
+                    'video_size': entry['video'].file_size if entry['video'] else None,
+                    'snapshot': entry['snapshot'] is not None,
+                    'corrupt': False
+                }
+                for media_index, entry in archive.media.items()
+            }
+            bad_members = archive.bad_members() if verify_crc else []
+    except (zipfile.BadZipFile, OSError) as e:
+        return {'status': 'corrupt', 'error': str(e), 'media': {}}
+
+    if not bad_members:
+        return {'status': 'ok', 'error': None, 'media': media}
+
+    for member in bad_members:
+        match = MEDIA_MEMBER_PATTERN.match(member)
+        if match and int(match.group(2)) in media:
+            media[int(match.group(2))]['corrupt'] = True
+    return {'status': 'corrupt', 'error': f"{len(bad_members)} member(s) fail the CRC check, e.g. {bad_members[0]}", 'media': media}
+
+
+class ZipCatalog:
+    """
+    Persistent catalog of the ZIP files in an input directory.
+
+    Each archive is stored by filename together with the size and mtime it
+    had when it was inspected, its server and time range, the media listing
+    of its central directory and its integrity status. Unchanged archives
+    are answered from the catalog, so a rescan costs one stat per file; new
+    or changed ones are inspected in a thread pool (reading and
+    decompressing release the GIL).
+    """
+
+    def __init__(self, directory, filename=ZIP_CATALOG_FILENAME, video_formats=SUPPORTED_VIDEO_FORMATS,
+                 verify_crc=ZIP_CATALOG_VERIFY_CRC, workers=ZIP_CATALOG_WORKERS):
+        self.directory = directory
+        self.path = os.path.join(directory, filename)
+        self.video_formats = tuple(video_formats)
+        self.verify_crc = verify_crc
+        self.workers = workers
+        self.stats = {'archives': 0, 'unchanged': 0, 'inspected': 0, 'corrupt': 0}
+
+        self._conn = sqlite3.connect(self.path)
+        self._conn.execute(
+            """CREATE TABLE IF NOT EXISTS archives (
+                filename TEXT PRIMARY KEY,
+                size INTEGER NOT NULL,
+                mtime_ns INTEGER NOT NULL,
+                crc_checked INTEGER NOT NULL,
+                server_id TEXT NOT NULL,
+                start_datetime TEXT NOT NULL,
+                end_datetime TEXT NOT NULL,
+                status TEXT NOT NULL,
+                error TEXT,
+                media TEXT NOT NULL
+            )"""
+        )
+        self._conn.commit()
+
+        # One query up front instead of one per archive
+        self._records = {record[0]: record for record in self._conn.execute("SELECT * FROM archives")}
+
+    def lookup(self, filename, stat):
+        """Return the stored zip_info of an archive if it has not changed since it was inspected, else None."""
+        record = self._records.get(filename)
+        if record is None or (record[1], record[2]) != (stat.st_size, stat.st_mtime_ns):
+            return None
+        if self.verify_crc and not record[3]:
+            return None  # Listed without the CRC check, which is now wanted
+
+        start_datetime = datetime.fromisoformat(record[5])
+        end_datetime = datetime.fromisoformat(record[6])
+        return {
+            'server_id': record[4],
+            'start_datetime': start_datetime,
+            'end_datetime': end_datetime,
+            'start_date': start_datetime.strftime("%Y-%m-%d"),
+            'end_date': end_datetime.strftime("%Y-%m-%d"),
+            'integrity': record[7],
+            'integrity_error': record[8],
+            'media': {int(media_index): entry for media_index, entry in json.loads(record[9]).items()},
+            'size': stat.st_size,
+            'mtime_ns': stat.st_mtime_ns
+        }
+
+    def update(self, zip_files):
+        """
+        Inspect the scanned ZIP files not answered from the catalog and store them.
+
+        Adds 'integrity', 'integrity_error' and 'media' to every zip_info
+        that lacks them, and forgets archives no longer in the directory.
+        """
+        pending = [zip_info for zip_info in zip_files if 'integrity' not in zip_info]
+        self.stats = {'archives': len(zip_files), 'unchanged': len(zip_files) - len(pending), 'inspected': len(pending), 'corrupt': 0}
+
+        if pending:
+            check = "central directory and CRC" if self.verify_crc else "central directory"
+            print(f"🗂️  Checking {len(pending)} new or changed ZIP file(s) ({check})...")
+
+            def inspect(zip_info):
+                stat = os.stat(zip_info['filepath'])
+                return stat, inspect_archive(zip_info['filepath'], self.video_formats, self.verify_crc)
+
+            with ThreadPoolExecutor(max_workers=self.workers) as executor:
+                for zip_info, (stat, inspection) in zip(pending, executor.map(inspect, pending)):
+                    zip_info.update({
+                        'integrity': inspection['status'],
+                        'integrity_error': inspection['error'],
+                        'media': inspection['media'],
+                        'size': stat.st_size,
+                        'mtime_ns': stat.st_mtime_ns
+                    })
+                    self._conn.execute(
+                        "INSERT OR REPLACE INTO archives VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                        (
+                            zip_info['filename'], stat.st_size, stat.st_mtime_ns, int(self.verify_crc),
+                            zip_info['server_id'], zip_info['start_datetime'].isoformat(),
+                            zip_info['end_datetime'].isoformat(), inspection['status'], inspection['error'],
+                            json.dumps(inspection['media'])
+                        )
+                    )
+
+        scanned = {zip_info['filename'] for zip_info in zip_files}
+        for filename in self._records:
+            if filename not in scanned and not os.path.exists(os.path.join(self.directory, filename)):
+                self._conn.execute("DELETE FROM archives WHERE filename = ?", (filename,))
+        self._conn.commit()
+
+        for zip_info in zip_files:
+            if zip_info['integrity'] != 'ok':
+                self.stats['corrupt'] += 1
+                print(f"❌ Corrupted ZIP file: {zip_info['filename']} - {zip_info['integrity_error']}")
+
+        print(
+            f"🗂️  ZIP catalog: {self.stats['archives']} archives ({self.stats['unchanged']} unchanged, "
+            f"{self.stats['inspected']} checked), {self.stats['corrupt']} corrupt"
+        )
+
+    def close(self):
+        self._conn.close()
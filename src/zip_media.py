@@ -0,0 +1,117 @@
+import os
+import re
+import shutil
+import zipfile
+import zlib
+
+# Member layout inside an event archive: Event_Report_<...>/media/<index>/<file>
+MEDIA_MEMBER_PATTERN = re.compile(r'^(Event_Report_[^/]+)/media/(\d+)/([^/]+)$')
+SNAPSHOT_FILENAME = "eventSnapshot.jpg"
+COPY_BUFFER_SIZE = 1024 * 1024
+
+
+class ZipMediaArchive:
+    """
+    Read-only view over the media stored in an event ZIP archive.
+
+    The central directory is read once when the archive is opened and every
+    ``media/<index>/`` folder is mapped to its video and snapshot members, so
+    individual files can be streamed out without extracting the archive.
+    """
+
+    def __init__(self, zip_path, video_formats=('.mkv',)):
+        self.zip_path = zip_path
+        self.video_formats = tuple(video_formats)
+        self._zip = zipfile.ZipFile(zip_path, 'r')
+        self.media = {}
+        self._index_members()
+
+    def _index_members(self):
+        """Map media indices to their video and snapshot members."""
+        report_dir = None
+
+        for member in self._zip.infolist():
+            if member.is_dir():
+                continue
+
+            match = MEDIA_MEMBER_PATTERN.match(member.filename)
+            if not match:
+                continue
+
+            # Only the first Event_Report directory holds the media we use
+            if report_dir is None:
+                report_dir = match.group(1)
+            elif match.group(1) != report_dir:
+                continue
+
+            media_index = int(match.group(2))
+            filename = match.group(3)
+            entry = self.media.setdefault(media_index, {'video': None, 'snapshot': None})
+
+            if filename.endswith(self.video_formats):
+                if entry['video'] is None:
+                    entry['video'] = member
+            elif filename == SNAPSHOT_FILENAME:
+                entry['snapshot'] = member
+
+    def has_media_folder(self, media_index):
+        """Return True if the archive contains a media folder for this index."""
+        return media_index in self.media
+
+    def video_member(self, media_index):
+        """Return the ZipInfo of the video for a media index, or None."""
+        return self.media.get(media_index, {}).get('video')
+
+    def snapshot_member(self, media_index):
+        """Return the ZipInfo of the event snapshot for a media index, or None."""
+        return self.media.get(media_index, {}).get('snapshot')
+
+    def extract_member(self, member, output_path):
+        """Stream a single member (ZipInfo or name) to output_path and return the bytes written."""
+        if not isinstance(member, zipfile.ZipInfo):
+            member = self._zip.getinfo(member)
+
+        output_dir = os.path.dirname(output_path)
+        if output_dir:
+            os.makedirs(output_dir, exist_ok=True)
+
+        with self._zip.open(member, 'r') as source, open(output_path, 'wb') as target:
+            shutil.copyfileobj(source, target, COPY_BUFFER_SIZE)
+
+        return member.file_size
+
+    def bad_members(self):
+        """Read every member through its CRC check and return the names of those that fail."""
+        bad = []
+        for member in self._zip.infolist():
+            try:
+                with self._zip.open(member, 'r') as source:
+                    while source.read(COPY_BUFFER_SIZE):
+                        pass
+            except (zipfile.BadZipFile, zlib.error, EOFError):
+                bad.append(member.filename)
+        return bad
+
+    def close(self):
+        self._zip.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+def open_media_archive(zip_info, video_formats=('.mkv',)):
+    """Open a ZIP archive for media access, returning None if it cannot be read."""
+    try:
+        return ZipMediaArchive(zip_info['filepath'], video_formats)
+    except zipfile.BadZipFile as e:
+        print(f"❌ Corrupted ZIP file: {zip_info['filename']}")
+        print(f"   Error: {e}")
+        print(f"   Please re-upload/re-download this ZIP file")
+        return None
+    except Exception as e:
+        print(f"❌ Error opening ZIP file: {zip_info['filename']}")
+        print(f"   Error: {e}")
+        return None